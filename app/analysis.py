@@ -0,0 +1,74 @@
+import pandas as pd
+
+# Columnas del archivo de pedidos que se cruzan con la base
+ORDER_COLUMNS = {'pedido1': 'Pedido1', 'pedido2': 'Pedido2', 'total': 'Total'}
+
+
+def client_analysis_frame(filtered_rows, orders_df, current_month):
+    """Filas del cliente con venta en el mes actual, cruzadas con los pedidos guardados.
+
+    Agrega unique_id, Pedido1, Pedido2, Total y has_saved_order. Si hay varias
+    filas de pedido por material gana la última.
+    """
+    if current_month in filtered_rows.columns:
+        current_values = filtered_rows[current_month]
+        rows = filtered_rows[current_values.notna() & (current_values != 0)].copy()
+    else:
+        rows = filtered_rows.iloc[0:0].copy()
+
+    if rows.empty:
+        return rows
+
+    rows['unique_id'] = rows['Categoria'].astype(str) + '-' + rows.index.astype(str)
+
+    material = rows['Material'].astype(object)
+    if orders_df is not None and not orders_df.empty:
+        orders = orders_df.drop_duplicates(subset='material', keep='last').set_index('material')
+        has_order = material.isin(orders.index)
+        for order_col, base_col in ORDER_COLUMNS.items():
+            values = material.map(orders[order_col].astype(object))
+            rows[base_col] = values.where(has_order, 0).astype(object)
+    else:
+        has_order = pd.Series(False, index=rows.index)
+        for base_col in ORDER_COLUMNS.values():
+            rows[base_col] = 0
+    rows['has_saved_order'] = has_order.to_numpy()
+    return rows
+
+
+def category_positions(rows):
+    """Posiciones de las filas por Categoria, en el orden en que aparece cada una."""
+    positions = rows.groupby('Categoria', sort=False, observed=True, dropna=False).indices
+    return sorted(positions.items(), key=lambda item: item[1][0])
+
+
+def group_client_rows(filtered_rows, orders_df, current_month, next_year_month):
+    """Agrupa por Categoria las filas del cliente con venta en el mes actual.
+
+    Equivale al recorrido fila por fila con iterrows: filtra con una máscara sobre
+    el mes actual, cruza los pedidos guardados por Material y arma las listas por
+    categoría con un groupby.
+    """
+    rows = client_analysis_frame(filtered_rows, orders_df, current_month)
+    if rows.empty:
+        return {}
+
+    current_values = rows[current_month].tolist()
+    if next_year_month in rows.columns:
+        next_values = rows[next_year_month].fillna(0).tolist()
+    else:
+        next_values = [0] * len(rows)
+
+    # Registros armados columna por columna (más rápido que to_dict por fila)
+    columns = list(rows.columns)
+    records = [dict(zip(columns, values)) for values in zip(*(rows[col].tolist() for col in columns))]
+    for record, current_value, next_value in zip(records, current_values, next_values):
+        record['Filtered Months'] = {
+            current_month: current_value,
+            next_year_month: next_value
+        }
+
+    grouped_data = {}
+    for categoria, group_positions in category_positions(rows):
+        grouped_data[categoria] = [records[i] for i in group_positions]
+    return grouped_data
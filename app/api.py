@@ -0,0 +1,122 @@
+"""Respuesta JSON de /api/analyze para la aplicación móvil de pedidos.
+
+Las filas se serializan por bloques con DataFrame.to_json (codificador en C de
+pandas, sin to_dict por fila) y el cuerpo se arma concatenando esos bloques. La
+respuesta se comprime con brotli si está instalado y el cliente lo acepta, o
+con gzip.
+"""
+import gzip
+import hashlib
+import json
+
+import pandas as pd
+
+from app.analysis import category_positions
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+# Campos por fila que se pueden pedir con ?fields=
+API_FIELDS = [
+    'unique_id', 'Material', 'Descripcion', 'Presentacion', 'Embalaje', 'Factor',
+    'referencia', 'actual', 'Pedido1', 'Pedido2', 'Total', 'has_saved_order'
+]
+
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+
+# Cuerpos más chicos no se comprimen
+MIN_COMPRESS_BYTES = 1024
+
+
+def parse_fields(fields):
+    """Lista de campos pedidos (todos si no se indica); ValueError si alguno no existe."""
+    if not fields:
+        return list(API_FIELDS)
+    selected = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in selected if field not in API_FIELDS]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {unknown}. Disponibles: {API_FIELDS}")
+    return selected
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def _records_json(frame):
+    if frame.empty:
+        return '[]'
+    return frame.to_json(orient='records', force_ascii=False)
+
+
+def analysis_body(header, rows, orders_df, products, months, fields, page, per_page, orders_version):
+    """Arma el JSON (bytes) de una página de categorías del análisis del cliente."""
+    current_month, next_year_month = months
+    categories = category_positions(rows) if not rows.empty else []
+    page_categories = categories[(page - 1) * per_page:page * per_page]
+
+    # Columnas con nombres estables para la aplicación: referencia / actual
+    frame = rows.assign(
+        referencia=rows[current_month] if current_month in rows.columns else 0,
+        actual=rows[next_year_month].fillna(0) if next_year_month in rows.columns else 0
+    ) if not rows.empty else pd.DataFrame(columns=API_FIELDS)
+    frame = frame[fields]
+
+    blocks = [
+        '{"categoria":' + _dumps(categoria) + ',"rows":' + _records_json(frame.iloc[positions]) + '}'
+        for categoria, positions in page_categories
+    ]
+
+    saved_orders = '[]' if orders_df is None else _records_json(orders_df)
+    meta = {
+        "cliente": header.get('Cliente'),
+        "vendedor": header.get('Vendedor'),
+        "nombre": header.get('Nombre'),
+        "months": {"referencia": current_month, "actual": next_year_month},
+        "orders_version": orders_version,
+        "page": page,
+        "per_page": per_page,
+        "total_categories": len(categories),
+        "total_pages": (len(categories) + per_page - 1) // per_page,
+        "fields": fields,
+    }
+    body = (
+        _dumps(meta)[:-1]
+        + ',"categories":[' + ','.join(blocks) + ']'
+        + ',"saved_orders":' + saved_orders
+        + ',"added_products":' + _dumps(products)
+        + '}'
+    )
+    return body.encode('utf-8')
+
+
+def negotiate_encoding(accept_encoding):
+    """'br', 'gzip' o None según Accept-Encoding y lo disponible."""
+    accepted = {
+        part.split(';')[0].strip().lower()
+        for part in (accept_encoding or '').split(',')
+        if not part.strip().endswith(';q=0')
+    }
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    """Devuelve (cuerpo, encoding aplicado); los cuerpos chicos van sin comprimir."""
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body, quality=5), 'br'
+    return gzip.compress(body, compresslevel=6), 'gzip'
+
+
+def etag_for(key, encoding):
+    """ETag a partir de las versiones de los datos, sin tener que armar el cuerpo."""
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+    return f"{digest}-{encoding}" if encoding else digest
@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from app.forecast import build_forecasts
+from app.ingest import REQUIRED_COLUMNS, binary_path, load_base
+from app.metrics import record_cache, record_read, stage
+from app.months import MonthIndex, month_block, share_month_columns, window_stats
+from app.products import build_product_index
+from app.search import ClientSearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Versión inmutable de la base ya normalizada, con sus índices de búsqueda."""
+
+    def __init__(self, df, signature, load_seconds, source='csv'):
+        # Meses detectados en el encabezado y sus valores como bloque numérico; las
+        # columnas de meses del DataFrame son vistas de ese bloque (sin copia)
+        self.months = MonthIndex.from_columns(df.columns)
+        self.month_block = month_block(df, self.months)
+        df = share_month_columns(df, self.months, self.month_block)
+
+        self.df = df
+        self.signature = signature
+        self.load_seconds = load_seconds
+        self.source = source
+        self.loaded_at = datetime.now()
+        self.row_count = len(df)
+
+        # Índices de posiciones por (Cliente, Vendedor) y por Categoria
+        self.client_index = df.groupby(['Cliente', 'Vendedor'], sort=False, observed=True).indices if len(df) else {}
+        self.category_index = df.groupby('Categoria', sort=False, observed=True).indices if len(df) else {}
+        self.categories = sorted(self.category_index)
+
+        # Índice de prefijos de clientes (ID y palabras del Nombre) para el autocompletado
+        self.client_search = ClientSearchIndex.from_snapshot(df, self.client_index)
+
+        # Pronósticos de pedido para todas las filas, calculados una vez por carga
+        self.forecasts = build_forecasts(df, self.month_block, self.months)
+
+        # Listas de productos por categoría ya serializadas para los desplegables
+        self.product_index = build_product_index(df) if len(df) else {}
+
+    @property
+    def version(self):
+        return "{:x}-{:x}".format(*self.signature)
+
+    def missing_columns(self, columns):
+        """Columnas de `columns` que la base no tiene (cada ruta pide solo las que usa)."""
+        return [col for col in columns if col not in self.df.columns]
+
+    def client_rows(self, client_id, vendedor):
+        positions = self.client_index.get((client_id, vendedor))
+        if positions is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[positions]
+
+    def category_rows(self, categoria):
+        positions = self.category_index.get(categoria)
+        if positions is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[positions]
+
+    def client_trends(self, client_id, vendedor, window):
+        """Suma, promedio y variación interanual por fila del cliente sobre la ventana de meses."""
+        positions = self.client_index.get((client_id, vendedor))
+        if positions is None:
+            return None
+        return window_stats(self.month_block[positions], self.months, window)
+
+    def client_forecast(self, client_id, vendedor):
+        positions = self.client_index.get((client_id, vendedor))
+        if positions is None:
+            return None
+        return self.forecasts.iloc[positions]
+
+    def product_payload(self, categoria, kind):
+        return self.product_index.get(categoria, {}).get(kind)
+
+    def status(self):
+        return {
+            "version": self.version,
+            "source": self.source,
+            "rows": self.row_count,
+            "clients": len(self.client_index),
+            "categories": len(self.categories),
+            "months": [str(period) for period in self.months.periods],
+            "load_seconds": round(self.load_seconds, 4),
+            "loaded_at": self.loaded_at.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+class Catalog:
+    """Catálogo compartido por el proceso: carga la base una vez y la recarga si el archivo cambia."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def build(self, df, signature, parse_seconds=0.0, source='csv'):
+        """Construye un snapshot (índices, productos, pronósticos) sin publicarlo."""
+        start = time.perf_counter()
+        with stage('build_index'):
+            snapshot = CatalogSnapshot(df, signature, 0.0, source)
+        snapshot.load_seconds = parse_seconds + time.perf_counter() - start
+        logger.info("Base cargada desde %s: %s filas en %.3fs (%s)", source, snapshot.row_count, snapshot.load_seconds, self.path)
+        missing_columns = snapshot.missing_columns(REQUIRED_COLUMNS)
+        if missing_columns:
+            logger.warning("La base no contiene las columnas requeridas: %s", missing_columns)
+        return snapshot
+
+    def install(self, snapshot):
+        """Publica un snapshot ya construido; quien tenga el anterior lo sigue usando."""
+        with self._lock:
+            self._snapshot = snapshot
+
+    def _load(self, signature):
+        start = time.perf_counter()
+        with stage('load_base'):
+            df, source = load_base(self.path)
+        record_read(source, binary_path(self.path) if source == 'binary' else self.path)
+        return self.build(df, signature, time.perf_counter() - start, source)
+
+    def get(self):
+        # Lanza FileNotFoundError si la base no existe
+        signature = self._signature()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.signature == signature:
+            record_cache('catalog', True)
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.signature != signature:
+                record_cache('catalog', False)
+                self._snapshot = self._load(signature)
+            else:
+                record_cache('catalog', True)
+            return self._snapshot
+
+    def status(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False, "path": self.path}
+        return dict(snapshot.status(), loaded=True, path=self.path)
@@ -0,0 +1,101 @@
+"""Pool acotado para sacar el trabajo pesado del hilo de la petición.
+
+Con workers gthread de gunicorn (ver gunicorn.conf.py) cada worker atiende
+varias peticiones en hilos. Un PDF de FPDF es Python puro y retiene el GIL, así
+que se genera en procesos aparte: el hilo de la petición solo espera el
+resultado y los demás hilos siguen respondiendo /get_products y compañía.
+
+El pool tiene un límite de trabajos en curso más en espera; si se llena se lanza
+PoolBusyError y la ruta responde 503 en lugar de encolar sin límite. Los
+procesos arrancan con el primer trabajo, no con el worker.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class PoolBusyError(Exception):
+    """El pool tiene todos sus lugares ocupados (en ejecución y en espera)."""
+
+
+class OffloadPool:
+    """Ejecuta funciones en un pool de procesos o hilos con cupo limitado.
+
+    Con max_workers=0 la función corre en el hilo actual (modo sin pool).
+    """
+
+    def __init__(self, kind='process', max_workers=2, max_pending=8, initializer=None, wait_timeout=5):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.initializer = initializer
+        self.wait_timeout = wait_timeout
+        self._slots = threading.BoundedSemaphore(max(max_workers, 1) + max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    # spawn: los procesos no heredan hilos ni conexiones del worker web
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=self.initializer
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='offload',
+                        initializer=self.initializer
+                    )
+            return self._executor
+
+    def _discard(self, executor):
+        # Descarta ese pool solo si sigue siendo el actual (otro hilo pudo haberlo reemplazado)
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, func, *args, **kwargs):
+        """Encola func(*args, **kwargs) y devuelve el Future.
+
+        Espera un lugar libre hasta wait_timeout segundos (None: sin límite) y
+        lanza PoolBusyError si no lo consigue.
+        """
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            raise PoolBusyError("Hay demasiados trabajos en curso; intente nuevamente en unos segundos.")
+        try:
+            executor = self._pool()
+            try:
+                future = executor.submit(func, *args, **kwargs)
+            except BrokenExecutor:
+                # Un proceso del pool murió antes: se reintenta en un pool nuevo
+                self._discard(executor)
+                future = self._pool().submit(func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, func, *args, timeout=None, **kwargs):
+        """Ejecuta func(*args, **kwargs) en el pool y espera el resultado."""
+        if not self.max_workers:
+            return func(*args, **kwargs)
+
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except BrokenExecutor:
+            # Un proceso del pool murió: se descarta el pool y se crea otro en la próxima llamada
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
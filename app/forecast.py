@@ -0,0 +1,70 @@
+"""Pronóstico de Pedido1/Pedido2 a partir del historial mensual de la base.
+
+Se calcula para todas las filas a la vez sobre el bloque de meses del catálogo
+(una pasada vectorizada por mes), así servir un pronóstico es solo una búsqueda.
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# 'suavizado' (suavizado exponencial simple) o 'media_movil'
+FORECAST_METHOD = os.environ.get('FORECAST_METHOD', 'suavizado')
+FORECAST_ALPHA = float(os.environ.get('FORECAST_ALPHA', 0.5))
+FORECAST_WINDOW = int(os.environ.get('FORECAST_WINDOW', 3))
+
+
+def exponential_smoothing(values, alpha):
+    """Nivel final del suavizado exponencial simple, fila por fila (meses en columnas)."""
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0])
+    level = values[:, 0].copy()
+    for month in range(1, values.shape[1]):
+        level = alpha * values[:, month] + (1 - alpha) * level
+    return level
+
+
+def moving_average(values, window):
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0])
+    return values[:, -window:].mean(axis=1)
+
+
+def round_up_to_factor(values, factors):
+    """Redondea hacia arriba al múltiplo del Factor (la misma regla de add_product)."""
+    return np.ceil(np.maximum(values, 0) / factors) * factors
+
+
+def build_forecasts(df, block, months, today=None, method=None, alpha=None, window=None):
+    """Pronóstico por fila de la base: DataFrame con Pronostico, Pedido1, Pedido2 y Total."""
+    method = method or FORECAST_METHOD
+    alpha = FORECAST_ALPHA if alpha is None else alpha
+    window = window or FORECAST_WINDOW
+
+    # Solo los meses ya transcurridos
+    today = pd.Period(today or datetime.now(), freq='M')
+    history = [i for i, period in enumerate(months.periods) if period <= today]
+    values = block[:, history]
+
+    if method == 'media_movil':
+        forecast = moving_average(values, window)
+    else:
+        forecast = exponential_smoothing(values, alpha)
+
+    if 'Factor' in df.columns:
+        factors = pd.to_numeric(df['Factor'], errors='coerce').fillna(1).to_numpy(dtype=np.float64)
+    else:
+        factors = np.ones(len(df))
+    factors = np.where(factors >= 1, factors, 1)
+
+    # El pedido se reparte en dos entregas, cada una múltiplo del Factor
+    pedido1 = round_up_to_factor(forecast / 2, factors)
+    pedido2 = round_up_to_factor(forecast - pedido1, factors)
+
+    return pd.DataFrame({
+        'Pronostico': forecast.round(2),
+        'Pedido1': pedido1,
+        'Pedido2': pedido2,
+        'Total': pedido1 + pedido2,
+    })
@@ -0,0 +1,156 @@
+"""Ingesta de la base de ventas a formato columnar.
+
+Convierte Basesdedatos.csv en un archivo Feather sin compresión junto al CSV
+(Basesdedatos.feather), con las columnas de IDs como categorías y los meses ya
+numéricos. Leerlo es mucho más rápido que volver a parsear el CSV, que solo se
+lee cuando la copia binaria falta o quedó desactualizada.
+
+La base se convierte a un DataFrame en la memoria del proceso (to_pandas copia
+las columnas); los workers de gunicorn la comparten porque el master la carga
+antes del fork (preload_app en gunicorn.conf.py), no por el archivo.
+
+Uso:
+    python -m app.ingest [ruta/al/Basesdedatos.csv]
+"""
+import logging
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from app.months import MonthIndex
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow es opcional
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+# Columnas que debe traer la base; se validan una sola vez al cargarla
+REQUIRED_COLUMNS = ['Vendedor', 'Cliente', 'Nombre', 'Categoria', 'Material', 'Descripcion', 'Presentacion', 'Embalaje', 'Factor']
+
+# Columnas numéricas además de los meses (los meses se detectan por su encabezado)
+ORDER_COLUMNS = ['Pedido1', 'Pedido2', 'Total']
+
+# Columnas de texto que se limpian de espacios al cargar la base
+TEXT_COLUMNS = ['Cliente', 'Vendedor', 'Nombre', 'Categoria', 'Material', 'Descripcion', 'Presentacion', 'Embalaje', 'Factor']
+
+# Columnas con muchos valores repetidos que se guardan como categorías
+CATEGORICAL_COLUMNS = ['Cliente', 'Vendedor', 'Nombre', 'Categoria', 'Material']
+
+# Clave de metadatos con la firma del CSV del que salió la copia binaria
+SOURCE_KEY = b'adheplast.source'
+
+# Versión del formato de la copia binaria; se incrementa si cambia la normalización
+FORMAT_KEY = b'adheplast.format'
+FORMAT_VERSION = b'2'
+
+
+def normalize_base(df):
+    """Limpia la base una sola vez: nombres de columnas, IDs y columnas numéricas."""
+    df.columns = df.columns.str.strip()
+
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].str.strip()
+    if 'Vendedor' in df.columns:
+        df['Vendedor'] = df['Vendedor'].str.zfill(3)
+
+    numeric_columns = MonthIndex.from_columns(df.columns).columns + ORDER_COLUMNS
+    for col in numeric_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    return df
+
+
+def read_csv_base(csv_path):
+    return normalize_base(pd.read_csv(csv_path, dtype=str))
+
+
+def binary_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+
+def source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}".encode()
+
+
+def write_binary(df, csv_path, signature=None):
+    """Escribe la copia columnar de forma atómica (archivo temporal + rename)."""
+    if feather is None:
+        raise RuntimeError("pyarrow no está instalado; no se puede generar la copia binaria.")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_KEY] = signature or source_signature(csv_path)
+    metadata[FORMAT_KEY] = FORMAT_VERSION
+    table = table.replace_schema_metadata(metadata)
+
+    target = binary_path(csv_path)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        # Sin compresión: se lee con memory-map sin descomprimir a un buffer intermedio
+        feather.write_feather(table, temp_path, compression='uncompressed')
+        # mkstemp crea el archivo solo legible por el dueño
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, target)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return target
+
+
+def read_binary(csv_path, signature=None):
+    """Devuelve la base desde la copia binaria, o None si falta o está desactualizada."""
+    path = binary_path(csv_path)
+    if feather is None or not os.path.exists(path):
+        return None
+
+    # El memory-map evita leer el archivo a un buffer propio; to_pandas igual copia los datos
+    table = feather.read_table(path, memory_map=True)
+    metadata = table.schema.metadata or {}
+    if metadata.get(SOURCE_KEY) != (signature or source_signature(csv_path)) or \
+            metadata.get(FORMAT_KEY) != FORMAT_VERSION:
+        return None
+    return table.to_pandas()
+
+
+def load_base(csv_path):
+    """Carga la base normalizada, preferentemente desde la copia binaria."""
+    signature = source_signature(csv_path)
+    df = read_binary(csv_path, signature)
+    if df is not None:
+        return df, 'binary'
+
+    df = read_csv_base(csv_path)
+    if feather is not None:
+        # Regenerar la copia binaria para el próximo arranque
+        try:
+            write_binary(df, csv_path, signature)
+        except OSError as e:
+            logger.warning("No se pudo escribir la copia binaria de %s: %s", csv_path, e)
+    return df, 'csv'
+
+
+def ingest(csv_path):
+    df = read_csv_base(csv_path)
+    target = write_binary(df, csv_path)
+    return df, target
+
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join('data', 'uploaded_files', 'Basesdedatos.csv')
+    df, target = ingest(csv_path)
+    print(f"{len(df)} filas convertidas a {target}")
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import shutil
+import socket
+import tempfile
+import time
+import threading
+import uuid
+import zipfile
+from concurrent.futures import as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.concurrency import OffloadPool
+from app.report_tasks import load_report_assets, render_partition
+
+# Columnas que se envían a los procesos de exportación
+REPORT_COLUMNS = ['Vendedor', 'Cliente', 'Categoria', 'Material', 'Descripcion']
+
+COMBINED_CSV_NAME = 'reporte_combinado.csv'
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Los trabajos terminados se eliminan después de este tiempo
+JOB_RETENTION_SECONDS = 24 * 60 * 60
+
+# Un trabajo en curso sin actualizar su estado en este tiempo se da por abandonado
+JOB_STALE_SECONDS = 10 * 60
+
+
+class ExportJobs:
+    """Exportación masiva de reportes PDF en segundo plano.
+
+    El estado de cada trabajo se guarda en data/exports/<job_id>/status.json para
+    que cualquier worker de gunicorn pueda responder la consulta de progreso. Los
+    PDFs se generan en un pool de procesos propio, fuera del ciclo de la petición.
+    """
+
+    def __init__(self, folder, max_workers=1, max_pending=4):
+        self.folder = folder
+        # Sin wait_timeout: el hilo del trabajo espera lugar en lugar de encolar todo el lote
+        self.pool = OffloadPool('process', max_workers=max(max_workers, 1), max_pending=max_pending,
+                                initializer=load_report_assets, wait_timeout=None)
+
+    def job_folder(self, job_id):
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            raise KeyError(job_id)
+        return os.path.join(self.folder, job_id)
+
+    def archive_path(self, job_id):
+        return os.path.abspath(os.path.join(self.job_folder(job_id), 'reportes.zip'))
+
+    def _write_status(self, job_id, status):
+        # Cada escritura sirve de latido del worker que ejecuta el trabajo
+        status["heartbeat_at"] = time.time()
+        job_folder = self.job_folder(job_id)
+        fd, temp_path = tempfile.mkstemp(dir=job_folder, suffix='.tmp')
+        with os.fdopen(fd, 'w') as temp_file:
+            json.dump(status, temp_file)
+        os.replace(temp_path, os.path.join(job_folder, 'status.json'))
+
+    def status(self, job_id):
+        """Devuelve el estado del trabajo; KeyError si no existe."""
+        status_path = os.path.join(self.job_folder(job_id), 'status.json')
+        if not os.path.exists(status_path):
+            raise KeyError(job_id)
+        with open(status_path) as status_file:
+            status = json.load(status_file)
+        if status["status"] in ('pending', 'running') and self._orphaned(status):
+            status = dict(status, status='failed',
+                          error="El proceso que generaba la exportación terminó antes de completarla.")
+        return status
+
+    @staticmethod
+    def _orphaned(status):
+        """True si el worker dueño del trabajo ya no existe o dejó de actualizarlo."""
+        if time.time() - status.get("heartbeat_at", 0) > JOB_STALE_SECONDS:
+            return True
+        if status.get("owner_host") != socket.gethostname():
+            return False
+        try:
+            os.kill(status["owner_pid"], 0)
+        except ProcessLookupError:
+            return True
+        except (KeyError, PermissionError):
+            pass
+        return False
+
+    def _prune(self):
+        # Borrar trabajos viejos para que data/exports no crezca sin límite
+        if not os.path.isdir(self.folder):
+            return
+        limit = time.time() - JOB_RETENTION_SECONDS
+        for name in os.listdir(self.folder):
+            job_folder = os.path.join(self.folder, name)
+            if JOB_ID_PATTERN.match(name) and os.path.getmtime(job_folder) < limit:
+                shutil.rmtree(job_folder, ignore_errors=True)
+
+    def submit(self, partitions, month_column):
+        """Encola la exportación de las particiones [(cliente, vendedor, filas), ...]."""
+        self._prune()
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_folder(job_id), exist_ok=True)
+        status = {
+            "job_id": job_id,
+            "status": "pending",
+            "total": len(partitions),
+            "done": 0,
+            "failed": [],
+            "month_column": month_column,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "finished_at": None,
+            "error": None,
+            # Worker de gunicorn que ejecuta el trabajo en un hilo
+            "owner_host": socket.gethostname(),
+            "owner_pid": os.getpid(),
+        }
+        self._write_status(job_id, status)
+
+        thread = threading.Thread(target=self._run, args=(job_id, status, partitions, month_column), daemon=True)
+        thread.start()
+        return job_id
+
+    def _run(self, job_id, status, partitions, month_column):
+        archive_path = self.archive_path(job_id)
+        temp_path = archive_path + '.tmp'
+        try:
+            status["status"] = "running"
+            self._write_status(job_id, status)
+
+            with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                def collect(future):
+                    try:
+                        client_id, vendedor, pdf_bytes = future.result()
+                        archive.writestr(f"Datos_Adheplast_{client_id}_{vendedor}.pdf", pdf_bytes)
+                    except Exception as e:
+                        status["failed"].append(str(e))
+                    status["done"] += 1
+                    self._write_status(job_id, status)
+
+                # submit espera cuando el pool está lleno; mientras tanto se guardan los PDFs listos
+                pending = set()
+                for client_id, vendedor, rows in partitions:
+                    pending.add(self.pool.submit(render_partition, client_id, vendedor,
+                                                 report_rows(rows, month_column), month_column))
+                    finished = {future for future in pending if future.done()}
+                    for future in finished:
+                        collect(future)
+                    pending -= finished
+                for future in as_completed(pending):
+                    collect(future)
+
+                # CSV combinado con todas las filas exportadas
+                combined = [rows for _, _, rows in partitions]
+                if combined:
+                    archive.writestr(COMBINED_CSV_NAME, pd.concat(combined).to_csv(index=False))
+
+            os.replace(temp_path, archive_path)
+            if partitions and len(status["failed"]) == len(partitions):
+                status["status"] = "failed"
+                status["error"] = "No se pudo generar ningún reporte."
+            else:
+                status["status"] = "completed"
+        except Exception as e:
+            status["status"] = "failed"
+            status["error"] = str(e)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        status["finished_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._write_status(job_id, status)
+
+
+def report_frame(rows, month_column):
+    """Columnas del reporte sin categorías (para el CSV combinado y report_rows)."""
+    return rows[REPORT_COLUMNS + [month_column]].astype({col: object for col in REPORT_COLUMNS})
+
+
+def report_rows(rows, month_column):
+    """Filas del reporte como tuplas de tipos nativos, para enviarlas a un proceso de PDF.
+
+    El proceso no necesita pandas para desempaquetarlas (ver app/report_tasks.py).
+    """
+    columns = REPORT_COLUMNS + [month_column]
+    return list(zip(*(rows[col].tolist() for col in columns)))
+
+
+def partition_rows(snapshot, pairs, month_column):
+    """Particiona la base una sola vez para todo el lote: [(cliente, vendedor, filas)]."""
+    positions = [snapshot.client_index[pair] for pair in pairs if pair in snapshot.client_index]
+    if not positions:
+        return []
+
+    batch = snapshot.df.iloc[np.concatenate(positions)]
+    batch = report_frame(batch[batch[month_column] > 0], month_column)
+
+    partitions = []
+    for (client_id, vendedor), rows in batch.groupby(['Cliente', 'Vendedor'], sort=False):
+        partitions.append((str(client_id), str(vendedor), rows))
+    return partitions
@@ -1,492 +1,848 @@
-from collections import defaultdict
-from datetime import datetime
-from flask import Flask, request, render_template, jsonify, send_file, make_response
-import os
-import pandas as pd
-import tempfile
-from fpdf import FPDF
-import requests
-
-app = Flask(__name__)
-app.secret_key = "your_secret_key"
-
-# Definición de todas las carpetas base
-BASE_DATA_DIR = 'data'
-UPLOAD_FOLDER = os.path.join(BASE_DATA_DIR, 'uploaded_files')
-RESULT_FOLDER = os.path.join(BASE_DATA_DIR, 'results')
-ORDERS_FOLDER = os.path.join(BASE_DATA_DIR, 'orders')
-ADDED_PRODUCTS_FOLDER = os.path.join(BASE_DATA_DIR, 'added_products')
-
-# Definición de archivos
-FILE_NAME = 'Basesdedatos.csv'
-file_path = os.path.join(UPLOAD_FOLDER, FILE_NAME)
-ADDED_PRODUCTS_FILE = os.path.join(ADDED_PRODUCTS_FOLDER, 'added_products.csv')
-
-# Crear todas las carpetas necesarias
-for folder in [UPLOAD_FOLDER, RESULT_FOLDER, ORDERS_FOLDER, ADDED_PRODUCTS_FOLDER]:
-    os.makedirs(folder, exist_ok=True)
-
-# Función para inicializar el archivo de persistencia
-def initialize_persistence_file():
-    if not os.path.exists(ADDED_PRODUCTS_FILE):
-        # Crear el archivo CSV con las columnas necesarias
-        pd.DataFrame(columns=[
-            'Cliente', 'Vendedor', 'Categoria', 'Descripcion', 'Cantidad', 
-            'Factor', 'Material', 'Presentacion', 'Embalaje'
-        ]).to_csv(ADDED_PRODUCTS_FILE, index=False)
-
-# Inicializar archivo de persistencia
-initialize_persistence_file()
-
-@app.route('/')
-def index():
-    return render_template('index.html')
-
-@app.route('/analyze', methods=['POST'])
-def analyze_client_data():
-    client_id = request.form.get('client_id')
-    vendedor = request.form.get('vendedor')
-
-    if not client_id or not vendedor:
-        return render_template('index.html', error="Los campos Cliente ID y Vendedor ID son obligatorios.")
-
-    if not os.path.exists(file_path):
-        return f"Error: File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'.", 404
-
-    try:
-        # Leer el archivo CSV principal
-        df = pd.read_csv(file_path, dtype={'Cliente': str, 'Vendedor': str})
-        df.columns = df.columns.str.strip()
-
-        client_id = str(client_id).strip()
-        vendedor = str(int(vendedor)).zfill(3)
-        df['Cliente'] = df['Cliente'].str.strip()
-        df['Vendedor'] = df['Vendedor'].str.strip().str.zfill(3)
-
-        # Buscar archivo de orders para este cliente/vendedor
-        orders_file = f'latest_orders_{client_id}_{vendedor}.csv'
-        orders_path = os.path.join(ORDERS_FOLDER, orders_file)
-
-        # Crear diccionario de orders si existe el archivo
-        orders_dict = {}
-        if os.path.exists(orders_path):
-            orders_df = pd.read_csv(orders_path)
-            for _, order_row in orders_df.iterrows():
-                orders_dict[order_row['material']] = {
-                    'pedido1': order_row['pedido1'],
-                    'pedido2': order_row['pedido2'],
-                    'total': order_row['total']
-                }
-
-        month_columns = [
-            "Jan-24", "Feb-24", "Mar-24", "Apr-24", "May-24", "Jun-24", "Jul-24", "Aug-24", "Sep-24", "Oct-24", "Nov-24", "Dec-24",
-            "Jan-25", "Feb-25", "Mar-25", "Apr-25", "May-25", "Jun-25", "Jul-25", "Aug-25", "Sep-25", "Oct-25", "Nov-25", "Dec-25"
-        ]
-
-        for col in month_columns + ['Pedido1', 'Pedido2', 'Total']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        required_columns = ['Material', 'Descripcion', 'Presentacion']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            return f"Error: Columnas faltantes en el archivo: {missing_columns}", 400
-
-        filtered_rows = df[(df['Cliente'] == client_id) & (df['Vendedor'] == vendedor)]
-        if filtered_rows.empty:
-            return render_template('result.html', message=f"No records found for Client ID: {client_id} and Vendedor: {vendedor}", data=None)
-
-        first_row = filtered_rows.iloc[0][['Vendedor', 'Cliente', 'Nombre']].to_dict()
-
-        current_month = datetime.now().strftime("%b") + "-24"
-        next_year_month = datetime.now().strftime("%b") + "-25"
-
-        grouped_data = defaultdict(list)
-        for index, row in filtered_rows.iterrows():
-            current_month_value = row.get(current_month, 0)
-            next_year_month_value = row.get(next_year_month, 0)
-            if pd.isna(current_month_value) or current_month_value == 0:
-                continue
-            row_dict = row.to_dict()
-            row_dict['unique_id'] = f"{row['Categoria']}-{index}"
-            row_dict['Filtered Months'] = {
-                current_month: current_month_value,
-                next_year_month: next_year_month_value if not pd.isna(next_year_month_value) else 0
-            }
-            
-            # Actualizar pedidos si existen en orders_dict y agregar indicador
-            if row['Material'] in orders_dict:
-                row_dict['Pedido1'] = orders_dict[row['Material']]['pedido1']
-                row_dict['Pedido2'] = orders_dict[row['Material']]['pedido2']
-                row_dict['Total'] = orders_dict[row['Material']]['total']
-                row_dict['has_saved_order'] = True
-            else:
-                row_dict['Pedido1'] = 0
-                row_dict['Pedido2'] = 0
-                row_dict['Total'] = 0
-                row_dict['has_saved_order'] = False
-            
-            grouped_data[row['Categoria']].append(row_dict)
-
-        unique_categories = sorted(df['Categoria'].dropna().unique())
-
-        # Leer productos agregados
-        if os.path.exists(ADDED_PRODUCTS_FILE):
-            added_df = pd.read_csv(ADDED_PRODUCTS_FILE, dtype=str)
-        else:
-            added_df = pd.DataFrame(columns=[
-                'Cliente', 'Vendedor', 'Categoria', 'Descripcion', 'Cantidad', 
-                'Factor', 'Material', 'Presentacion', 'Embalaje'
-            ])
-
-        filtered_products = added_df[
-            (added_df['Cliente'] == client_id) & 
-            (added_df['Vendedor'] == vendedor)
-        ]
-
-        products = filtered_products.to_dict(orient='records')
-
-        return render_template(
-            'result.html',
-            header_data=first_row,
-            grouped_data=grouped_data,
-            message="Análisis Exitoso!",
-            month_columns=[current_month, next_year_month],
-            categorias=unique_categories,
-            products=products,
-            has_orders=bool(os.path.exists(orders_path)),
-            current_month=current_month  
-        )
-
-    except Exception as e:
-        return f"An error occurred: {e}", 500
-
-@app.route('/save_orders', methods=['POST'])
-def save_orders():
-    try:
-        # Obtener los datos del request
-        data = request.get_json()
-        client_id = data.get('client_id')
-        vendedor = data.get('vendedor')
-        orders = data.get('orders', [])
-        
-        # Crear el nombre del archivo fijo
-        filename = f'latest_orders_{client_id}_{vendedor}.csv'
-        orders_file = os.path.join(ORDERS_FOLDER, filename)
-        
-        # Eliminar archivo anterior si existe
-        if os.path.exists(orders_file):
-            os.remove(orders_file)
-        
-        # Crear DataFrame con los pedidos
-        orders_df = pd.DataFrame(orders)
-        orders_df['fecha_actualizacion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        orders_df['cliente'] = client_id
-        orders_df['vendedor'] = vendedor
-        
-        # Guardar en CSV
-        orders_df.to_csv(orders_file, index=False)
-        
-        return jsonify({
-            "success": True,
-            "message": "Pedidos actualizados exitosamente",
-            "filename": filename
-        })
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
-
-
-
-@app.route('/add_product', methods=['POST'])
-def add_product():
-    ADDED_PRODUCTS_FOLDER = os.path.join('data', 'added_products')
-    ADDED_PRODUCTS_FILE = os.path.join(ADDED_PRODUCTS_FOLDER, 'added_products.csv')
-    os.makedirs(ADDED_PRODUCTS_FOLDER, exist_ok=True)
-
-    # Inicializar el archivo de persistencia si no existe
-    if not os.path.exists(ADDED_PRODUCTS_FILE):
-        pd.DataFrame(columns=['Cliente', 'Vendedor', 'Categoria', 'Descripcion', 'Cantidad', 'Factor', 'Material', 'Presentacion', 'Embalaje']) \
-          .to_csv(ADDED_PRODUCTS_FILE, index=False)
-
-    # Obtener datos del formulario
-    categoria = request.form.get('categoria')
-    producto = request.form.get('producto')
-    cantidad = request.form.get('cantidad')
-    client_id = request.form.get('client_id')
-    vendedor = request.form.get('vendedor')
-
-    # Validar los campos obligatorios
-    if not all([categoria, producto, cantidad, client_id, vendedor]):
-        return jsonify({"error": "Todos los campos son obligatorios. Verifica los datos ingresados."}), 400
-
-    if not os.path.exists(file_path):
-        return jsonify({"error": f"Archivo '{FILE_NAME}' no encontrado en '{UPLOAD_FOLDER}'."}), 404
-
-    try:
-        # Validar que cantidad sea un número positivo
-        cantidad = int(cantidad)
-        if cantidad <= 0:
-            return jsonify({"error": "La cantidad debe ser mayor que 0."}), 400
-
-        # Leer el archivo CSV original
-        df = pd.read_csv(file_path, dtype=str, low_memory=False)
-        df.columns = df.columns.str.strip()
-
-        # Validar columnas necesarias
-        required_columns = ['Categoria', 'Descripcion', 'Factor', 'Material', 'Presentacion', 'Embalaje']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            return jsonify({"error": f"El archivo CSV no contiene las columnas requeridas: {missing_columns}"}), 400
-
-        # Filtrar los datos según la categoría y descripción proporcionadas y eliminar duplicados
-        filtered_row = df[(df['Categoria'].str.strip() == categoria) &
-                         (df['Descripcion'].str.strip() == producto)] \
-                        .drop_duplicates(subset=['Categoria', 'Descripcion']) \
-                        .reset_index(drop=True)
-
-        if filtered_row.empty:
-            return jsonify({"error": "No se encontró un producto con la categoría y descripción proporcionadas."}), 404
-
-        # Obtener valores preestablecidos del archivo original
-        factor = int(filtered_row.iloc[0]['Factor'])
-        material = filtered_row.iloc[0]['Material']
-        presentacion = filtered_row.iloc[0]['Presentacion']
-        embalaje = filtered_row.iloc[0]['Embalaje']
-
-        # Validar cantidad múltiplo del factor
-        if cantidad % factor != 0:
-            return jsonify({
-                "error": f"La cantidad debe ser múltiplo de {factor}. Por favor, ingrese un número que sea múltiplo de {factor}.",
-                "factor": factor
-            }), 400
-
-        # Leer o inicializar el archivo de persistencia
-        if os.path.exists(ADDED_PRODUCTS_FILE) and os.path.getsize(ADDED_PRODUCTS_FILE) > 0:
-            added_df = pd.read_csv(ADDED_PRODUCTS_FILE, dtype=str)
-        else:
-            added_df = pd.DataFrame(columns=['Cliente', 'Vendedor', 'Categoria', 'Descripcion', 'Cantidad', 'Factor', 'Material', 'Presentacion', 'Embalaje'])
-
-        # Verificar si ya existe un registro para cliente, vendedor, categoría y producto
-        existing_row = added_df[(added_df['Cliente'].str.strip() == client_id) &
-                              (added_df['Vendedor'].str.strip() == vendedor) &
-                              (added_df['Categoria'].str.strip() == categoria) &
-                              (added_df['Descripcion'].str.strip() == producto)]
-
-        if not existing_row.empty:
-            # Actualizar cantidad existente
-            index = existing_row.index[0]
-            added_df.at[index, 'Cantidad'] = int(added_df.at[index, 'Cantidad']) + cantidad
-        else:
-            # Agregar un nuevo registro
-            new_row = {
-                'Cliente': client_id.strip(),
-                'Vendedor': vendedor.strip(),
-                'Categoria': categoria.strip(),
-                'Descripcion': producto.strip(),
-                'Cantidad': cantidad,
-                'Factor': factor,
-                'Material': material,
-                'Presentacion': presentacion,
-                'Embalaje': embalaje
-            }
-            added_df = pd.concat([added_df, pd.DataFrame([new_row])], ignore_index=True)
-
-        # Guardar los datos actualizados en el archivo de persistencia
-        added_df.to_csv(ADDED_PRODUCTS_FILE, index=False)
-
-        return jsonify({
-            "success": True,
-            "cliente": client_id,
-            "vendedor": vendedor,
-            "categoria": categoria,
-            "producto": producto,
-            "cantidad": cantidad,
-            "factor": factor,
-            "material": material,
-            "presentacion": presentacion,
-            "embalaje": embalaje,
-            "message": "Producto agregado y persistido exitosamente."
-        })
-
-    except ValueError:
-        return jsonify({"error": "La cantidad debe ser un número válido."}), 400
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    
-
-@app.route('/products_by_category', methods=['GET'])
-def products_by_category():
-    categoria = request.args.get('categoria')
-
-    if not categoria:
-        return jsonify({"error": "El campo categoría es obligatorio."}), 400
-
-    if not os.path.exists(file_path):
-        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
-
-    try:
-        df = pd.read_csv(file_path)
-        df.columns = df.columns.str.strip()
-
-        # Modificamos esta línea para incluir Factor
-        required_columns = ['Categoria', 'Descripcion', 'Material', 'Presentacion', 'Embalaje', 'Factor']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            return jsonify({"error": f"El archivo CSV no contiene las columnas requeridas: {missing_columns}"}), 400
-
-        # Modificamos esta línea para incluir Factor en la selección
-        filtered_products = df[df['Categoria'].str.strip() == categoria][
-            ['Descripcion', 'Material', 'Presentacion', 'Embalaje', 'Factor']
-        ].dropna()
-
-        if filtered_products.empty:
-            return jsonify({"error": "No se encontraron productos para la categoría proporcionada."}), 404
-
-        products = filtered_products.to_dict(orient='records')
-        return jsonify({"products": products})
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    
-
-@app.route('/get_products', methods=['GET'])
-def get_products():
-    try:
-        categoria = request.args.get('categoria')
-        if not categoria:
-            return jsonify({"error": "Categoría no proporcionada"}), 400
-
-        df = pd.read_csv(file_path, dtype=str, low_memory=False)
-        df.columns = df.columns.str.strip()
-
-        # Filtrado mejorado con limpieza de strings
-        df['Categoria'] = df['Categoria'].str.strip()
-        df['Descripcion'] = df['Descripcion'].str.strip()
-        
-        filtered_df = df[df['Categoria'] == categoria.strip()]
-        
-        # Eliminar duplicados considerando todas las características relevantes
-        unique_products = filtered_df.drop_duplicates(
-            subset=['Descripcion', 'Material', 'Presentacion', 'Factor'],
-            keep='first'
-        ).sort_values('Descripcion')
-
-        productos = unique_products[['Descripcion', 'Material', 'Presentacion', 'Factor']].to_dict('records')
-        return jsonify({"productos": productos})
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    
-@app.route('/download_filtered_data', methods=['POST'])
-def download_filtered_data():
-    client_id = request.form.get('client_id')
-    vendedor = request.form.get('vendedor')
-
-    if not client_id or not vendedor:
-        return jsonify({"error": "Los campos Cliente y Vendedor son obligatorios."}), 400
-
-    if not os.path.exists(file_path):
-        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
-      
-    try:
-        df = pd.read_csv(file_path, dtype={'Cliente': str, 'Vendedor': str})
-        df.columns = df.columns.str.strip()
-
-        client_id = client_id.strip()
-        vendedor = str(int(vendedor)).zfill(3)
-        df['Cliente'] = df['Cliente'].str.strip()
-        df['Vendedor'] = df['Vendedor'].str.strip().str.zfill(3)
-
-        filtered_rows = df[(df['Cliente'] == client_id) & (df['Vendedor'] == vendedor)]
-
-        if filtered_rows.empty:
-            return jsonify({"error": "No records found to export."}), 404
-
-        month_column = datetime.now().strftime("%b") + "-24"
-        required_columns = ['Vendedor', 'Cliente', 'Categoria', 'Material', 'Descripcion', month_column]
-        missing_columns = [col for col in required_columns if col not in filtered_rows.columns]
-        if missing_columns:
-            return jsonify({"error": f"Columnas faltantes en el archivo: {missing_columns}"}), 400
-
-        filtered_rows[month_column] = pd.to_numeric(filtered_rows[month_column], errors='coerce')
-        filtered_rows = filtered_rows[filtered_rows[month_column] > 0]
-
-        if filtered_rows.empty:
-            return jsonify({"error": "No hay datos válidos después del filtrado."}), 404
-
-        pdf = FPDF(orientation='L', unit='mm', format='A4')
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-
-        pdf.set_font("Arial", style="B", size=14)
-        pdf.cell(0, 10, f"Reporte de Datos Filtrados - {datetime.now().strftime('%B %Y')}", ln=True, align="C")
-        pdf.ln(10)
-
-        # Insertar PNG en el encabezado
-        png_path = os.path.join('app', 'assets', 'Azul.png')
-        if os.path.exists(png_path):
-            pdf.image(png_path, x=10, y=8, w=30)  # Ajustar posición y tamaño del PNG
-
-        pdf.set_font("Arial", style="B", size=12)
-        pdf.cell(0, 10, "Información General", ln=True, align="L")
-        pdf.set_font("Arial", size=10)
-        pdf.cell(50, 10, f"Vendedor: {vendedor}", ln=True)
-        pdf.cell(50, 10, f"Cliente: {client_id}", ln=True)
-        pdf.ln(10)
-
-        pdf.set_font("Arial", style="B", size=12)
-        pdf.cell(0, 10, "Datos Filtrados", ln=True, align="L")
-        pdf.ln(5)
-
-        column_widths = [25, 25, 70, 30, 85, 20]
-        headers = ['Vendedor', 'Cliente', 'Categoria', 'Material', 'Descripcion', month_column]
-        pdf.set_font("Arial", style="B", size=10)
-        for i, header in enumerate(headers):
-            pdf.cell(column_widths[i], 10, header, border=1, align="C")
-        pdf.ln()
-
-        for _, row in filtered_rows.iterrows():
-            pdf.set_font("Arial", size=10)
-            pdf.cell(column_widths[0], 10, str(row['Vendedor']), border=1, align="C")
-            pdf.cell(column_widths[1], 10, str(row['Cliente']), border=1, align="C")
-            pdf.cell(column_widths[2], 10, str(row['Categoria']), border=1, align="L")
-            pdf.cell(column_widths[3], 10, str(row['Material']), border=1, align="C")
-            pdf.cell(column_widths[4], 10, str(row['Descripcion']), border=1, align="L")
-            pdf.cell(column_widths[5], 10, f"{row[month_column]:.2f}", border=1, align="C")
-            pdf.ln()
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_pdf:
-            temp_pdf_path = temp_pdf.name
-            pdf.output(temp_pdf_path)
-
-        response = make_response(send_file(
-            temp_pdf_path,
-            as_attachment=True,
-            download_name=f"Datos_Adheplast_{client_id}_{vendedor}.pdf",
-            mimetype='application/pdf'
-        ))
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f"attachment; filename=Datos_Adheplast_{client_id}_{vendedor}.pdf"
-        return response
-
-    except ValueError as ve:
-        return jsonify({"error": f"Error de validación: {ve}"}), 400
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/result')
-def result():
-    return render_template('result.html')
-
-@app.route('/response')
-def response():
-    return render_template('response.html')
-
-if __name__ == '__main__':
-    app.run(debug=True)
-
+from concurrent.futures import TimeoutError as PoolTimeoutError
+from datetime import datetime
+from flask import Flask, request, render_template, jsonify, send_file, make_response, Response
+import hmac
+import io
+import os
+import threading
+from markupsafe import Markup
+
+from app import api, metrics, search
+from app.analysis import client_analysis_frame, group_client_rows
+from app.cache import LRUCache
+from app.catalog import Catalog
+from app.concurrency import OffloadPool, PoolBusyError
+from app.jobs import ExportJobs, partition_rows, report_rows
+from app.metrics import stage
+from app.months import MonthIndex
+from app.orders import OrderConflictError
+from app.report_tasks import load_report_assets, render_report
+from app.storage import AddedProductsStore, OrderBook
+from app.upload import UploadError, import_base
+
+app = Flask(__name__)
+app.secret_key = "your_secret_key"
+
+# Latencia por ruta y por etapa (/metrics y cabecera Server-Timing)
+metrics.init_app(app)
+
+# Definición de todas las carpetas base
+BASE_DATA_DIR = 'data'
+UPLOAD_FOLDER = os.path.join(BASE_DATA_DIR, 'uploaded_files')
+RESULT_FOLDER = os.path.join(BASE_DATA_DIR, 'results')
+ORDERS_FOLDER = os.path.join(BASE_DATA_DIR, 'orders')
+ADDED_PRODUCTS_FOLDER = os.path.join(BASE_DATA_DIR, 'added_products')
+EXPORTS_FOLDER = os.path.join(BASE_DATA_DIR, 'exports')
+
+# Definición de archivos
+FILE_NAME = 'Basesdedatos.csv'
+file_path = os.path.join(UPLOAD_FOLDER, FILE_NAME)
+ADDED_PRODUCTS_FILE = os.path.join(ADDED_PRODUCTS_FOLDER, 'added_products.csv')
+ADDED_PRODUCTS_DB = os.path.join(ADDED_PRODUCTS_FOLDER, 'added_products.db')
+ORDERS_DB = os.path.join(ORDERS_FOLDER, 'orders.db')
+
+# Catálogo compartido de la base de ventas (se carga una vez por proceso)
+catalog = Catalog(file_path)
+
+# Pedidos de todos los clientes en un solo libro SQLite (importa una vez los latest_orders_*.csv)
+order_store = OrderBook(ORDERS_DB, legacy_folder=ORDERS_FOLDER)
+
+# Productos agregados (SQLite; importa una vez el CSV anterior si existe)
+added_products = AddedProductsStore(ADDED_PRODUCTS_DB, legacy_csv=ADDED_PRODUCTS_FILE)
+
+# Caché de PDFs ya generados: (cliente, vendedor, mes, versión de la base)
+PDF_CACHE_MAX_ENTRIES = int(os.environ.get('PDF_CACHE_MAX_ENTRIES', 64))
+PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+pdf_cache = LRUCache(max_entries=PDF_CACHE_MAX_ENTRIES, max_bytes=PDF_CACHE_MAX_BYTES)
+
+# Exportación masiva de reportes en un pool de procesos propio (EXPORT_WORKERS procesos por worker web)
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 1))
+export_jobs = ExportJobs(EXPORTS_FOLDER, max_workers=EXPORT_WORKERS)
+
+# PDFs de /download_filtered_data en procesos aparte, con cupo limitado (PDF_WORKERS=0: en la petición)
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', 2))
+PDF_QUEUE = int(os.environ.get('PDF_QUEUE', 8))
+PDF_TIMEOUT = int(os.environ.get('PDF_TIMEOUT', 60))
+pdf_pool = OffloadPool('process', max_workers=PDF_WORKERS, max_pending=PDF_QUEUE, initializer=load_report_assets)
+
+# Carpetas y bases SQLite: se preparan en la primera petición (o en warm_up), no al importar
+_persistence_ready = False
+_persistence_lock = threading.Lock()
+
+# Función para inicializar el archivo de persistencia
+def initialize_persistence_file():
+    global _persistence_ready
+    if _persistence_ready:
+        return
+    with _persistence_lock:
+        if _persistence_ready:
+            return
+        # Crear todas las carpetas necesarias
+        for folder in [UPLOAD_FOLDER, RESULT_FOLDER, ORDERS_FOLDER, ADDED_PRODUCTS_FOLDER, EXPORTS_FOLDER]:
+            os.makedirs(folder, exist_ok=True)
+        added_products.initialize()
+        order_store.initialize()
+        _persistence_ready = True
+
+@app.before_request
+def ensure_persistence():
+    initialize_persistence_file()
+
+def warm_up():
+    """Prepara data/ y carga el catálogo antes de la primera petición.
+
+    gunicorn lo llama en el master con preload_app (ver gunicorn.conf.py): los
+    workers se crean con fork y comparten la base cargada sin copiarla.
+    """
+    initialize_persistence_file()
+    if os.path.exists(file_path):
+        catalog.get()
+
+# Respuesta JSON ya serializada, con ETag para responder 304 si no cambió
+def payload_response(payload):
+    response = app.response_class(payload.body, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response = response.make_conditional(request)
+    metrics.record_cache('product_payload', response.status_code == 304)
+    return response
+
+# Vista de /analyze por cliente: (cliente, vendedor, versión de la base, de los pedidos y de los productos agregados)
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', 256))
+ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', 300))
+analysis_cache = LRUCache(max_entries=ANALYSIS_CACHE_MAX_ENTRIES, ttl=ANALYSIS_CACHE_TTL)
+
+# Fragmentos HTML iguales para todos los clientes (por versión de la base)
+fragment_cache = LRUCache(max_entries=8)
+
+# Opciones del selector de categorías, renderizadas una vez por versión de la base
+def category_options(snapshot):
+    key = ('category_options', snapshot.version)
+    fragment = fragment_cache.get(key)
+    metrics.record_cache('category_options', fragment is not None)
+    if fragment is None:
+        fragment = Markup(render_template('category_options.html', categorias=snapshot.categories))
+        fragment_cache.put(key, fragment)
+    return fragment
+
+# Descarta la vista en caché de un cliente después de guardar sus pedidos o productos
+def invalidate_client(client_id, vendedor):
+    try:
+        client_id = str(client_id).strip()
+        vendedor = str(int(vendedor)).zfill(3)
+    except (TypeError, ValueError):
+        return
+    analysis_cache.invalidate(lambda key: key[:2] == (client_id, vendedor))
+
+# Columna de mes que se usa en los reportes PDF (mes actual del año anterior)
+def report_month_column(snapshot):
+    reference_month, _ = snapshot.months.comparison_columns(datetime.now())
+    return reference_month
+
+# Ventana de meses por defecto para las tendencias por cliente
+MONTH_WINDOW = int(os.environ.get('MONTH_WINDOW', 12))
+
+# Token para reemplazar la base por /upload_base; sin él la carga queda deshabilitada
+UPLOAD_TOKEN = os.environ.get('UPLOAD_TOKEN')
+
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+@app.route('/analyze', methods=['POST'])
+def analyze_client_data():
+    client_id = request.form.get('client_id')
+    vendedor = request.form.get('vendedor')
+
+    if not client_id or not vendedor:
+        return render_template('index.html', error="Los campos Cliente ID y Vendedor ID son obligatorios.")
+
+    if not os.path.exists(file_path):
+        return f"Error: File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'.", 404
+
+    try:
+        # Obtener la base ya normalizada del catálogo
+        with stage('catalog'):
+            snapshot = catalog.get()
+
+        client_id = str(client_id).strip()
+        vendedor = str(int(vendedor)).zfill(3)
+
+        missing_columns = snapshot.missing_columns(['Material', 'Descripcion', 'Presentacion'])
+        if missing_columns:
+            return f"Error: Columnas faltantes en el archivo: {missing_columns}", 400
+
+        # Mes actual del año anterior (referencia) y del año en curso, según el encabezado
+        current_month, next_year_month = snapshot.months.comparison_columns(datetime.now())
+
+        # La vista se reutiliza mientras no cambien la base, los pedidos ni los productos agregados
+        with stage('versions'):
+            cache_key = (
+                client_id, vendedor, snapshot.version,
+                order_store.signature(client_id, vendedor),
+                added_products.version(client_id, vendedor),
+                current_month, next_year_month
+            )
+        view = analysis_cache.get(cache_key)
+        metrics.record_cache('analysis', view is not None)
+
+        if view is None:
+            # Pedidos guardados para este cliente/vendedor (None si no hay)
+            with stage('orders'):
+                orders_df, orders_version = order_store.load(client_id, vendedor)
+
+            with stage('filter'):
+                filtered_rows = snapshot.client_rows(client_id, vendedor)
+            if filtered_rows.empty:
+                return render_template('result.html', message=f"No records found for Client ID: {client_id} and Vendedor: {vendedor}", data=None)
+
+            first_row = filtered_rows.iloc[0][['Vendedor', 'Cliente', 'Nombre']].to_dict()
+
+            # Filtrado, cruce con pedidos y agrupación por categoría en bloque
+            with stage('group'):
+                grouped_data = group_client_rows(filtered_rows, orders_df, current_month, next_year_month)
+
+            # Productos agregados del cliente (consulta por índice)
+            with stage('added_products'):
+                products = added_products.for_client(client_id, vendedor)
+
+            view = {
+                "header_data": first_row,
+                "grouped_data": grouped_data,
+                "month_columns": [current_month, next_year_month],
+                "categorias": snapshot.categories,
+                "products": products,
+                "has_orders": orders_df is not None,
+                "orders_version": orders_version,
+                "current_month": current_month,
+                "month_label": MonthIndex.label(next_year_month or current_month or '')
+            }
+            analysis_cache.put(cache_key, view)
+
+        with stage('render'):
+            return render_template(
+                'result.html',
+                message="Análisis Exitoso!",
+                category_options=category_options(snapshot),
+                **view
+            )
+
+    except Exception as e:
+        return f"An error occurred: {e}", 500
+
+@app.route('/api/analyze', methods=['GET'])
+def api_analyze():
+    client_id = request.args.get('client_id')
+    vendedor = request.args.get('vendedor')
+
+    if not client_id or not vendedor:
+        return jsonify({"error": "Los campos Cliente y Vendedor son obligatorios."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
+
+    try:
+        fields = api.parse_fields(request.args.get('fields'))
+        page = int(request.args.get('page', 1))
+        per_page = min(int(request.args.get('per_page', api.DEFAULT_PER_PAGE)), api.MAX_PER_PAGE)
+        if page < 1 or per_page < 1:
+            return jsonify({"error": "page y per_page deben ser mayores que 0."}), 400
+
+        with stage('catalog'):
+            snapshot = catalog.get()
+        client_id = client_id.strip()
+        vendedor = str(int(vendedor)).zfill(3)
+
+        # Además de las de /analyze, las filas de la API incluyen Embalaje y Factor
+        missing_columns = snapshot.missing_columns(['Nombre', 'Material', 'Descripcion', 'Presentacion', 'Embalaje', 'Factor'])
+        if missing_columns:
+            return jsonify({"error": f"Columnas faltantes en el archivo: {missing_columns}"}), 400
+
+        months = snapshot.months.comparison_columns(datetime.now())
+
+        # Mismas versiones que la vista HTML: base, pedidos y productos agregados
+        with stage('versions'):
+            cache_key = (
+                client_id, vendedor, snapshot.version,
+                order_store.signature(client_id, vendedor),
+                added_products.version(client_id, vendedor),
+                months, 'api', tuple(fields), page, per_page
+            )
+        encoding = api.negotiate_encoding(request.headers.get('Accept-Encoding'))
+        etag = api.etag_for(cache_key, encoding)
+
+        # Sin cambios desde la última consulta: 304 sin armar la respuesta
+        not_modified = request.if_none_match.contains(etag)
+        metrics.record_cache('api_analyze', not_modified)
+        if not_modified:
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            response.headers['Vary'] = 'Accept-Encoding'
+            return response
+
+        body = analysis_cache.get(cache_key)
+        metrics.record_cache('analysis', body is not None)
+        if body is None:
+            with stage('filter'):
+                filtered_rows = snapshot.client_rows(client_id, vendedor)
+            if filtered_rows.empty:
+                return jsonify({"error": "No records found."}), 404
+
+            with stage('orders'):
+                orders_df, orders_version = order_store.load(client_id, vendedor)
+            with stage('group'):
+                rows = client_analysis_frame(filtered_rows, orders_df, months[0])
+            with stage('added_products'):
+                products = added_products.for_client(client_id, vendedor)
+
+            header = {col: str(filtered_rows[col].iloc[0]) for col in ['Vendedor', 'Cliente', 'Nombre']}
+            with stage('serialize'):
+                body = api.analysis_body(
+                    header, rows, orders_df, products, months, fields, page, per_page, orders_version
+                )
+            analysis_cache.put(cache_key, body, size=len(body))
+
+        with stage('compress'):
+            content, applied = api.compress(body, encoding)
+        response = app.response_class(content, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if applied:
+            response.headers['Content-Encoding'] = applied
+        return response
+
+    except ValueError as ve:
+        return jsonify({"error": f"Error de validación: {ve}"}), 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/save_orders', methods=['POST'])
+def save_orders():
+    try:
+        # Obtener los datos del request
+        data = request.get_json()
+        client_id = data.get('client_id')
+        vendedor = data.get('vendedor')
+        orders = data.get('orders', [])
+
+        if not client_id or not vendedor:
+            return jsonify({"success": False, "error": "Los campos Cliente y Vendedor son obligatorios."}), 400
+
+        # Mismas claves con las que /analyze y /api/analyze leen los pedidos
+        try:
+            client_id = str(client_id).strip()
+            vendedor = str(int(vendedor)).zfill(3)
+        except ValueError:
+            return jsonify({"success": False, "error": "El vendedor debe ser numérico."}), 400
+        
+        # delta: solo vienen los materiales modificados
+        # version: la que vio el cliente; si otra pestaña guardó antes se rechaza
+        delta = bool(data.get('delta', False))
+        version = data.get('version')
+
+        filename = order_store.filename(client_id, vendedor)
+        with stage('save'):
+            new_version = order_store.save(client_id, vendedor, orders, delta=delta, expected_version=version)
+        invalidate_client(client_id, vendedor)
+        
+        return jsonify({
+            "success": True,
+            "message": "Pedidos actualizados exitosamente",
+            "filename": filename,
+            "version": new_version
+        })
+    except OrderConflictError as e:
+        return jsonify({
+            "success": False,
+            "error": "Los pedidos fueron modificados desde otra pestaña. Recargue la página antes de guardar.",
+            "version": e.current_version
+        }), 409
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+
+@app.route('/add_product', methods=['POST'])
+def add_product():
+    # Obtener datos del formulario
+    categoria = request.form.get('categoria')
+    producto = request.form.get('producto')
+    cantidad = request.form.get('cantidad')
+    client_id = request.form.get('client_id')
+    vendedor = request.form.get('vendedor')
+
+    # Validar los campos obligatorios
+    if not all([categoria, producto, cantidad, client_id, vendedor]):
+        return jsonify({"error": "Todos los campos son obligatorios. Verifica los datos ingresados."}), 400
+
+    # Mismas claves con las que /analyze y /api/analyze leen los productos agregados
+    try:
+        client_id = client_id.strip()
+        vendedor = str(int(vendedor)).zfill(3)
+    except ValueError:
+        return jsonify({"error": "El vendedor debe ser numérico."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"Archivo '{FILE_NAME}' no encontrado en '{UPLOAD_FOLDER}'."}), 404
+
+    try:
+        # Validar que cantidad sea un número positivo
+        cantidad = int(cantidad)
+        if cantidad <= 0:
+            return jsonify({"error": "La cantidad debe ser mayor que 0."}), 400
+
+        # Obtener la base ya normalizada del catálogo
+        with stage('catalog'):
+            snapshot = catalog.get()
+
+        missing_columns = snapshot.missing_columns(['Categoria', 'Descripcion', 'Factor', 'Material', 'Presentacion', 'Embalaje'])
+        if missing_columns:
+            return jsonify({"error": f"El archivo CSV no contiene las columnas requeridas: {missing_columns}"}), 400
+
+        # Filtrar los datos según la categoría y descripción proporcionadas y eliminar duplicados
+        with stage('filter'):
+            category_rows = snapshot.category_rows(categoria)
+            filtered_row = category_rows[category_rows['Descripcion'] == producto] \
+                            .drop_duplicates(subset=['Categoria', 'Descripcion']) \
+                            .reset_index(drop=True)
+
+        if filtered_row.empty:
+            return jsonify({"error": "No se encontró un producto con la categoría y descripción proporcionadas."}), 404
+
+        # Obtener valores preestablecidos del archivo original
+        factor = int(filtered_row.iloc[0]['Factor'])
+        material = filtered_row.iloc[0]['Material']
+        presentacion = filtered_row.iloc[0]['Presentacion']
+        embalaje = filtered_row.iloc[0]['Embalaje']
+
+        # Validar cantidad múltiplo del factor
+        if cantidad % factor != 0:
+            return jsonify({
+                "error": f"La cantidad debe ser múltiplo de {factor}. Por favor, ingrese un número que sea múltiplo de {factor}.",
+                "factor": factor
+            }), 400
+
+        # Sumar la cantidad o agregar el registro en una sola operación atómica
+        with stage('save'):
+            added_products.add({
+                'Cliente': client_id,
+                'Vendedor': vendedor,
+                'Categoria': categoria.strip(),
+                'Descripcion': producto.strip(),
+                'Cantidad': cantidad,
+                'Factor': str(factor),
+                'Material': material,
+                'Presentacion': presentacion,
+                'Embalaje': embalaje
+            })
+        invalidate_client(client_id, vendedor)
+
+        return jsonify({
+            "success": True,
+            "cliente": client_id,
+            "vendedor": vendedor,
+            "categoria": categoria,
+            "producto": producto,
+            "cantidad": cantidad,
+            "factor": factor,
+            "material": material,
+            "presentacion": presentacion,
+            "embalaje": embalaje,
+            "message": "Producto agregado y persistido exitosamente."
+        })
+
+    except ValueError:
+        return jsonify({"error": "La cantidad debe ser un número válido."}), 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/products_by_category', methods=['GET'])
+def products_by_category():
+    categoria = request.args.get('categoria')
+
+    if not categoria:
+        return jsonify({"error": "El campo categoría es obligatorio."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
+
+    try:
+        with stage('catalog'):
+            snapshot = catalog.get()
+
+        missing_columns = snapshot.missing_columns(['Categoria', 'Descripcion', 'Material', 'Presentacion', 'Embalaje', 'Factor'])
+        if missing_columns:
+            return jsonify({"error": f"El archivo CSV no contiene las columnas requeridas: {missing_columns}"}), 400
+
+        # Lista precalculada al cargar la base (ordenada y sin duplicados)
+        payload = snapshot.product_payload(categoria, 'products')
+        if payload is None:
+            return jsonify({"error": "No se encontraron productos para la categoría proporcionada."}), 404
+
+        return payload_response(payload)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/get_products', methods=['GET'])
+def get_products():
+    try:
+        categoria = request.args.get('categoria')
+        if not categoria:
+            return jsonify({"error": "Categoría no proporcionada"}), 400
+
+        # Lista precalculada al cargar la base (ordenada y sin duplicados)
+        with stage('catalog'):
+            snapshot = catalog.get()
+        payload = snapshot.product_payload(categoria.strip(), 'productos')
+        if payload is None:
+            return jsonify({"productos": []})
+
+        return payload_response(payload)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+@app.route('/download_filtered_data', methods=['POST'])
+def download_filtered_data():
+    client_id = request.form.get('client_id')
+    vendedor = request.form.get('vendedor')
+
+    if not client_id or not vendedor:
+        return jsonify({"error": "Los campos Cliente y Vendedor son obligatorios."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
+      
+    try:
+        with stage('catalog'):
+            snapshot = catalog.get()
+
+        client_id = client_id.strip()
+        vendedor = str(int(vendedor)).zfill(3)
+
+        with stage('filter'):
+            filtered_rows = snapshot.client_rows(client_id, vendedor)
+
+        if filtered_rows.empty:
+            return jsonify({"error": "No records found to export."}), 404
+
+        month_column = report_month_column(snapshot)
+        if month_column is None:
+            return jsonify({"error": "La base no tiene una columna para el mes actual."}), 400
+        missing_columns = snapshot.missing_columns(['Vendedor', 'Cliente', 'Categoria', 'Material', 'Descripcion', month_column])
+        if missing_columns:
+            return jsonify({"error": f"Columnas faltantes en el archivo: {missing_columns}"}), 400
+
+        # Las columnas de meses ya vienen numéricas desde el catálogo
+        with stage('month_filter'):
+            filtered_rows = filtered_rows[filtered_rows[month_column] > 0]
+
+        if filtered_rows.empty:
+            return jsonify({"error": "No hay datos válidos después del filtrado."}), 404
+
+        # Reutilizar el PDF si la base no cambió desde la última descarga
+        report_month = datetime.now().strftime('%B %Y')
+        cache_key = (client_id, vendedor, month_column, report_month, snapshot.version)
+        pdf_bytes = pdf_cache.get(cache_key)
+        metrics.record_cache('pdf', pdf_bytes is not None)
+        if pdf_bytes is None:
+            with stage('pdf'):
+                pdf_bytes = pdf_pool.run(
+                    render_report, report_rows(filtered_rows, month_column),
+                    client_id, vendedor, month_column, timeout=PDF_TIMEOUT
+                )
+            pdf_cache.put(cache_key, pdf_bytes, size=len(pdf_bytes))
+
+        # Se envía desde memoria, sin archivos temporales
+        response = make_response(send_file(
+            io.BytesIO(pdf_bytes),
+            as_attachment=True,
+            download_name=f"Datos_Adheplast_{client_id}_{vendedor}.pdf",
+            mimetype='application/pdf'
+        ))
+        response.headers['Content-Type'] = 'application/pdf'
+        response.headers['Content-Disposition'] = f"attachment; filename=Datos_Adheplast_{client_id}_{vendedor}.pdf"
+        return response
+
+    except PoolBusyError as e:
+        return jsonify({"error": str(e)}), 503, {'Retry-After': '5'}
+
+    except PoolTimeoutError:
+        # El proceso sigue generando el PDF, pero la petición no espera más
+        return jsonify({"error": f"El reporte tardó más de {PDF_TIMEOUT} segundos. Intente nuevamente en unos minutos."}), 504
+
+    except ValueError as ve:
+        return jsonify({"error": f"Error de validación: {ve}"}), 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/export_reports', methods=['POST'])
+def export_reports():
+    data = request.get_json(silent=True) or {}
+    vendedor = data.get('vendedor')
+    pairs = data.get('pairs')
+
+    if not vendedor and not pairs:
+        return jsonify({"error": "Debe indicar un vendedor o una lista de pares cliente/vendedor."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
+
+    try:
+        with stage('catalog'):
+            snapshot = catalog.get()
+        month_column = report_month_column(snapshot)
+        if month_column is None:
+            return jsonify({"error": "La base no tiene una columna para el mes actual."}), 400
+
+        if pairs:
+            selected = [
+                (str(pair['client_id']).strip(), str(int(pair['vendedor'])).zfill(3))
+                for pair in pairs
+            ]
+        else:
+            vendedor = str(int(vendedor)).zfill(3)
+            selected = [pair for pair in snapshot.client_index if pair[1] == vendedor]
+
+        with stage('partition'):
+            partitions = partition_rows(snapshot, selected, month_column)
+        if not partitions:
+            return jsonify({"error": "No records found to export."}), 404
+
+        job_id = export_jobs.submit(partitions, month_column)
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "total": len(partitions),
+            "status_url": f"/export_reports/{job_id}"
+        }), 202
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Error de validación: {e}"}), 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/export_reports/<job_id>', methods=['GET'])
+def export_report_status(job_id):
+    try:
+        status = export_jobs.status(job_id)
+    except KeyError:
+        return jsonify({"error": "Trabajo de exportación no encontrado."}), 404
+
+    if status["status"] == "completed":
+        status["download_url"] = f"/export_reports/{job_id}/download"
+    return jsonify(status)
+
+@app.route('/export_reports/<job_id>/download', methods=['GET'])
+def download_export(job_id):
+    try:
+        status = export_jobs.status(job_id)
+    except KeyError:
+        return jsonify({"error": "Trabajo de exportación no encontrado."}), 404
+
+    if status["status"] != "completed":
+        return jsonify({"error": "La exportación aún no ha terminado.", "status": status["status"]}), 409
+
+    metrics.record_read('exports', export_jobs.archive_path(job_id))
+    return send_file(
+        export_jobs.archive_path(job_id),
+        as_attachment=True,
+        download_name=f"Reportes_Adheplast_{job_id}.zip",
+        mimetype='application/zip'
+    )
+
+@app.route('/orders/demand', methods=['GET'])
+def orders_demand():
+    """Demanda pedida por material sumada sobre todos los clientes (filtros opcionales)."""
+    vendedor = request.args.get('vendedor')
+    categoria = request.args.get('categoria')
+
+    try:
+        if vendedor:
+            vendedor = str(int(vendedor)).zfill(3)
+        with stage('demand'):
+            demand = order_store.demand(vendedor=vendedor or None, categoria=categoria or None)
+        return jsonify({"demand": demand})
+    except ValueError:
+        return jsonify({"error": "El vendedor debe ser numérico."}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/client_trends', methods=['GET'])
+def client_trends():
+    client_id = request.args.get('client_id')
+    vendedor = request.args.get('vendedor')
+
+    if not client_id or not vendedor:
+        return jsonify({"error": "Los campos Cliente y Vendedor son obligatorios."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
+
+    try:
+        window = int(request.args.get('window', MONTH_WINDOW))
+        if window <= 0:
+            return jsonify({"error": "La ventana debe ser mayor que 0."}), 400
+
+        with stage('catalog'):
+            snapshot = catalog.get()
+        client_id = client_id.strip()
+        vendedor = str(int(vendedor)).zfill(3)
+
+        with stage('trends'):
+            stats = snapshot.client_trends(client_id, vendedor, window)
+        if stats is None:
+            return jsonify({"error": "No records found."}), 404
+
+        rows = snapshot.client_rows(client_id, vendedor)
+        window_columns = [snapshot.months.columns[i] for i in snapshot.months.window(window)]
+        trends = [
+            {
+                "Categoria": categoria,
+                "Material": material,
+                "Descripcion": descripcion,
+                "suma": round(float(suma), 4),
+                "promedio": round(float(promedio), 4),
+                "variacion_anual": round(float(variacion), 4)
+            }
+            for categoria, material, descripcion, suma, promedio, variacion in zip(
+                rows['Categoria'].tolist(), rows['Material'].tolist(), rows['Descripcion'].tolist(),
+                stats['suma'], stats['promedio'], stats['variacion_anual']
+            )
+        ]
+        return jsonify({"months": window_columns, "trends": trends})
+
+    except ValueError as ve:
+        return jsonify({"error": f"Error de validación: {ve}"}), 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/forecast', methods=['GET'])
+def forecast():
+    client_id = request.args.get('client_id')
+    vendedor = request.args.get('vendedor')
+
+    if not client_id or not vendedor:
+        return jsonify({"error": "Los campos Cliente y Vendedor son obligatorios."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
+
+    try:
+        with stage('catalog'):
+            snapshot = catalog.get()
+        client_id = client_id.strip()
+        vendedor = str(int(vendedor)).zfill(3)
+
+        # Precalculado al cargar la base: aquí solo se busca por índice
+        forecasts = snapshot.client_forecast(client_id, vendedor)
+        if forecasts is None:
+            return jsonify({"error": "No records found."}), 404
+
+        rows = snapshot.client_rows(client_id, vendedor)
+        sugerencias = [
+            {
+                "Categoria": categoria,
+                "Material": material,
+                "Descripcion": descripcion,
+                "Factor": factor,
+                "Pronostico": float(pronostico),
+                "Pedido1": int(pedido1),
+                "Pedido2": int(pedido2),
+                "Total": int(total)
+            }
+            for categoria, material, descripcion, factor, pronostico, pedido1, pedido2, total in zip(
+                rows['Categoria'].tolist(), rows['Material'].tolist(), rows['Descripcion'].tolist(),
+                rows['Factor'].tolist(), forecasts['Pronostico'].tolist(), forecasts['Pedido1'].tolist(),
+                forecasts['Pedido2'].tolist(), forecasts['Total'].tolist()
+            )
+        ]
+        return jsonify({"cliente": client_id, "vendedor": vendedor, "forecast": sugerencias})
+
+    except ValueError as ve:
+        return jsonify({"error": f"Error de validación: {ve}"}), 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/clients/search', methods=['GET'])
+def search_clients():
+    query = request.args.get('q', '')
+    vendedor = request.args.get('vendedor')
+
+    if not query.strip():
+        return jsonify({"error": "El parámetro q es obligatorio."}), 400
+
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"File '{FILE_NAME}' not found in '{UPLOAD_FOLDER}'."}), 404
+
+    try:
+        limit = min(int(request.args.get('limit', search.DEFAULT_LIMIT)), search.MAX_LIMIT)
+        if vendedor:
+            vendedor = str(int(vendedor)).zfill(3)
+
+        with stage('catalog'):
+            snapshot = catalog.get()
+        with stage('search'):
+            clients = snapshot.client_search.search(query, vendedor=vendedor or None, limit=limit)
+        return jsonify({"clients": clients})
+
+    except ValueError as ve:
+        return jsonify({"error": f"Error de validación: {ve}"}), 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/catalog_status', methods=['GET'])
+def catalog_status():
+    return jsonify(catalog.status())
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/upload_base', methods=['POST'])
+def upload_base():
+    if not UPLOAD_TOKEN:
+        return jsonify({"error": "La carga de la base está deshabilitada."}), 403
+    if not hmac.compare_digest(request.headers.get('X-Upload-Token', ''), UPLOAD_TOKEN):
+        return jsonify({"error": "Token de carga inválido."}), 403
+
+    uploaded = request.files.get('file')
+    if uploaded is None or not uploaded.filename:
+        return jsonify({"error": "Debe adjuntar el archivo de la base (campo 'file')."}), 400
+
+    try:
+        with stage('import'):
+            status = import_base(uploaded.stream, uploaded.filename, catalog)
+        # Los PDFs en caché quedan obsoletos con la nueva versión de la base
+        pdf_cache.clear()
+        return jsonify({"success": True, **status})
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/result')
+def result():
+    return render_template('result.html')
+
+@app.route('/response')
+def response():
+    return render_template('response.html')
+
+if __name__ == '__main__':
+    app.run(debug=True)
+
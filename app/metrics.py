@@ -0,0 +1,190 @@
+"""Métricas de la aplicación en formato de texto de Prometheus.
+
+Registro propio, sin dependencias: contadores e histogramas con etiquetas que se
+guardan en memoria del proceso. Con varios workers de gunicorn cada proceso
+expone sus propios valores en /metrics (la etiqueta `instance` del scrape o la
+suma en la consulta los agrupa).
+
+Además de las métricas globales, cada petición acumula la duración de sus etapas
+(`stage`) y las devuelve en la cabecera Server-Timing.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+# Límites en segundos de los histogramas de latencia
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels.get(name, '')) for name in self.labels), 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # key -> [conteos por bucket (no acumulados), suma, cantidad]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels, key, [('le', _format_value(bound))])
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.labels, key)
+                lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labels=()):
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    'adheplast_requests_total', 'Peticiones atendidas por ruta, método y código de estado.',
+    ('endpoint', 'method', 'status'))
+REQUEST_SECONDS = registry.histogram(
+    'adheplast_request_seconds', 'Duración de las peticiones por ruta.', ('endpoint',))
+STAGE_SECONDS = registry.histogram(
+    'adheplast_stage_seconds', 'Duración de cada etapa dentro de una ruta.', ('endpoint', 'stage'))
+DATA_BYTES_READ = registry.counter(
+    'adheplast_data_bytes_read_total', 'Bytes leídos de archivos en data/.', ('source',))
+CACHE_REQUESTS = registry.counter(
+    'adheplast_cache_requests_total', 'Consultas a las cachés de datos, por resultado.', ('cache', 'result'))
+
+
+def _endpoint():
+    return (request.endpoint or 'not_found') if has_request_context() else 'background'
+
+
+@contextmanager
+def stage(name):
+    """Mide una etapa de la petición en curso (o fuera de una petición)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, endpoint=_endpoint(), stage=name)
+        if has_request_context() and 'metrics_stages' in g:
+            g.metrics_stages.append((name, elapsed))
+
+
+def record_read(source, path):
+    """Cuenta los bytes de un archivo de data/ que se acaba de leer."""
+    try:
+        DATA_BYTES_READ.inc(os.path.getsize(path), source=source)
+    except OSError:
+        pass
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def server_timing(stages, total):
+    parts = [f'{name};dur={elapsed * 1000:.1f}' for name, elapsed in stages]
+    parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def init_app(app):
+    """Registra los hooks que miden cada petición y agregan Server-Timing."""
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_stages = []
+
+    @app.after_request
+    def _record_request(response):
+        if 'metrics_start' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_start
+        endpoint = _endpoint()
+        REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+        response.headers['Server-Timing'] = server_timing(g.metrics_stages, elapsed)
+        return response
+
+    return app
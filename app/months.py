@@ -0,0 +1,154 @@
+"""Resolución de las columnas de meses de la base.
+
+Los encabezados pueden venir en español ("Enero 24", "ene-2024"), en inglés
+("Jan-24", "January 2024") o en formato numérico ("2024-01", "01/2024"). Se
+interpretan una sola vez al cargar la base y se ordenan como períodos mensuales.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+MONTH_NAMES = {
+    # Español
+    'enero': 1, 'ene': 1, 'febrero': 2, 'feb': 2, 'marzo': 3, 'mar': 3,
+    'abril': 4, 'abr': 4, 'mayo': 5, 'may': 5, 'junio': 6, 'jun': 6,
+    'julio': 7, 'jul': 7, 'agosto': 8, 'ago': 8, 'septiembre': 9, 'setiembre': 9,
+    'sep': 9, 'sept': 9, 'set': 9, 'octubre': 10, 'oct': 10, 'noviembre': 11, 'nov': 11,
+    'diciembre': 12, 'dic': 12,
+    # Inglés
+    'january': 1, 'jan': 1, 'february': 2, 'march': 3, 'april': 4, 'apr': 4,
+    'june': 6, 'july': 7, 'august': 8, 'aug': 8, 'september': 9, 'october': 10,
+    'november': 11, 'december': 12, 'dec': 12,
+}
+
+# Nombre del mes que se muestra en la interfaz
+SPANISH_LABELS = [
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+    'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre'
+]
+
+_NAME_YEAR = re.compile(r'^([^\W\d_]+)\.?[\s\-_/]*(\d{2}|\d{4})$')
+_YEAR_MONTH = re.compile(r'^(\d{4})[\-/\.](\d{1,2})$')
+_MONTH_YEAR = re.compile(r'^(\d{1,2})[\-/\.](\d{4})$')
+
+
+def _year(text):
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+def parse_month_header(header):
+    """Devuelve el pd.Period mensual del encabezado, o None si no es una columna de mes."""
+    text = str(header).strip().lower()
+
+    match = _NAME_YEAR.match(text)
+    if match and match.group(1) in MONTH_NAMES:
+        return pd.Period(year=_year(match.group(2)), month=MONTH_NAMES[match.group(1)], freq='M')
+
+    match = _YEAR_MONTH.match(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return pd.Period(year=int(match.group(1)), month=int(match.group(2)), freq='M')
+
+    match = _MONTH_YEAR.match(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return pd.Period(year=int(match.group(2)), month=int(match.group(1)), freq='M')
+
+    return None
+
+
+class MonthIndex:
+    """Columnas de meses ordenadas cronológicamente, con su período y posición en el bloque."""
+
+    def __init__(self, columns, periods):
+        self.columns = list(columns)
+        self.periods = list(periods)
+        self.position = {col: i for i, col in enumerate(self.columns)}
+        self.by_period = dict(zip(self.periods, self.columns))
+
+    @classmethod
+    def from_columns(cls, columns):
+        parsed = [(parse_month_header(col), col) for col in columns]
+        parsed = sorted((period, col) for period, col in parsed if period is not None)
+        # Si un mes aparece dos veces se usa la primera columna
+        unique = {}
+        for period, col in parsed:
+            unique.setdefault(period, col)
+        return cls(unique.values(), unique.keys())
+
+    def __len__(self):
+        return len(self.columns)
+
+    def column_for(self, period):
+        return self.by_period.get(period)
+
+    def latest_for_month(self, month, not_after=None):
+        """Último período de la base con ese número de mes (opcionalmente hasta una fecha)."""
+        candidates = [p for p in self.periods if p.month == month and (not_after is None or p <= not_after)]
+        return candidates[-1] if candidates else None
+
+    def comparison_columns(self, today):
+        """(mes del año anterior, mismo mes del año en curso) para la fecha dada.
+
+        Si la base no llega al año en curso se usa el último año disponible con ese mes.
+        """
+        current = self.latest_for_month(today.month, not_after=pd.Period(today, freq='M'))
+        if current is None:
+            return None, None
+        return self.column_for(current - 12), self.column_for(current)
+
+    def window(self, size, end=None):
+        """Posiciones de los últimos `size` meses hasta `end` (incluido)."""
+        end_position = len(self.periods) - 1 if end is None else self.periods.index(end)
+        start_position = max(end_position - size + 1, 0)
+        return list(range(start_position, end_position + 1))
+
+    @staticmethod
+    def label(column_or_period):
+        period = column_or_period if isinstance(column_or_period, pd.Period) else parse_month_header(column_or_period)
+        return SPANISH_LABELS[period.month - 1] if period is not None else ''
+
+
+def month_block(df, months):
+    """Bloque (filas x meses) con los valores numéricos de los meses.
+
+    En orden Fortran: cada mes queda contiguo y puede usarse como columna del
+    DataFrame sin copiarlo (ver share_month_columns).
+    """
+    if not len(months):
+        return np.zeros((len(df), 0))
+    return np.asfortranarray(df[months.columns].to_numpy(dtype=np.float64))
+
+
+def share_month_columns(df, months, block):
+    """Devuelve df con sus columnas de meses float64 apuntando al bloque.
+
+    Así los valores de los meses se guardan una sola vez por snapshot. Las
+    columnas con otro tipo se dejan como están para no cambiar cómo se muestran.
+    """
+    columns = {
+        col: block[:, months.position[col]] if col in months.position and df[col].dtype == np.float64 else df[col]
+        for col in df.columns
+    }
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def window_stats(block, months, window, end=None):
+    """Suma, promedio y variación interanual del último mes de la ventana, fila por fila."""
+    if not len(months):
+        zeros = np.zeros(block.shape[0])
+        return {"suma": zeros, "promedio": zeros, "variacion_anual": zeros}
+
+    positions = months.window(window, end)
+    values = block[:, positions]
+    last_position = positions[-1]
+    previous_year = months.column_for(months.periods[last_position] - 12)
+    if previous_year is not None:
+        yoy = block[:, last_position] - block[:, months.position[previous_year]]
+    else:
+        yoy = np.zeros(block.shape[0])
+    return {
+        "suma": values.sum(axis=1),
+        "promedio": values.mean(axis=1),
+        "variacion_anual": yoy,
+    }
@@ -0,0 +1,52 @@
+import os
+import re
+
+import pandas as pd
+
+from app.metrics import record_read
+
+# latest_orders_{cliente}_{vendedor}.csv (el vendedor no lleva guiones bajos)
+LEGACY_FILE_PATTERN = re.compile(r'^latest_orders_(.+)_([^_]+)\.csv$')
+
+
+class OrderConflictError(Exception):
+    """La versión enviada no coincide con la guardada (otra pestaña ya guardó)."""
+
+    def __init__(self, current_version):
+        super().__init__(f"La versión actual de los pedidos es {current_version}.")
+        self.current_version = current_version
+
+
+def version_of(orders_df):
+    """Versión de un CSV de pedidos anterior (columna 'version'), 0 si no tiene filas."""
+    if orders_df is None or orders_df.empty or 'version' not in orders_df.columns:
+        return 0
+    return int(orders_df['version'].max())
+
+
+class LegacyOrderFiles:
+    """Lectura de los latest_orders_{cliente}_{vendedor}.csv anteriores al libro de pedidos.
+
+    Solo se usa para importarlos una vez a storage.OrderBook; los archivos no se
+    modifican.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def pairs(self):
+        """(cliente, vendedor, ruta) de cada archivo de pedidos de la carpeta."""
+        if not os.path.isdir(self.folder):
+            return []
+        pairs = []
+        for name in sorted(os.listdir(self.folder)):
+            match = LEGACY_FILE_PATTERN.match(name)
+            if match:
+                pairs.append((match.group(1), match.group(2), os.path.join(self.folder, name)))
+        return pairs
+
+    @staticmethod
+    def load(path):
+        orders_df = pd.read_csv(path, dtype={'material': str, 'cliente': str, 'vendedor': str})
+        record_read('orders', path)
+        return orders_df
@@ -0,0 +1,55 @@
+import hashlib
+import json
+from collections import namedtuple
+
+import pandas as pd
+
+# Respuesta JSON ya serializada, con su ETag
+JsonPayload = namedtuple('JsonPayload', ['body', 'etag'])
+
+# Columnas que devuelve /products_by_category
+PRODUCT_COLUMNS = ['Descripcion', 'Material', 'Presentacion', 'Embalaje', 'Factor']
+
+# Columnas que devuelve /get_products
+PRODUCTOS_COLUMNS = ['Descripcion', 'Material', 'Presentacion', 'Factor']
+
+
+def json_payload(obj):
+    body = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return JsonPayload(body, hashlib.sha1(body).hexdigest())
+
+
+def _records(frame):
+    # NaN -> None para que el JSON sea válido
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient='records')
+
+
+def _sorted_by_category(frame):
+    frame = frame.sort_values('Descripcion', kind='stable')
+    return frame.groupby('Categoria', sort=False, observed=True)
+
+
+def build_product_index(df):
+    """Arma por categoría la lista ordenada y sin duplicados de productos, ya serializada.
+
+    Devuelve {categoria: {'products': JsonPayload, 'productos': JsonPayload}}.
+    """
+    if any(col not in df.columns for col in ['Categoria'] + PRODUCT_COLUMNS):
+        return {}
+
+    index = {}
+
+    # /products_by_category: Factor numérico y sin filas incompletas
+    products = df[['Categoria'] + PRODUCT_COLUMNS].copy()
+    products['Factor'] = pd.to_numeric(products['Factor'], errors='coerce')
+    products = products.dropna().drop_duplicates()
+    for categoria, group in _sorted_by_category(products):
+        index.setdefault(categoria, {})['products'] = json_payload({"products": _records(group[PRODUCT_COLUMNS])})
+
+    # /get_products: se mantiene Factor como texto
+    productos = df[['Categoria'] + PRODUCTOS_COLUMNS].drop_duplicates(keep='first')
+    for categoria, group in _sorted_by_category(productos):
+        index.setdefault(categoria, {})['productos'] = json_payload({"productos": _records(group[PRODUCTOS_COLUMNS])})
+
+    return index
@@ -0,0 +1,24 @@
+"""Funciones que se ejecutan en los procesos de PDF (descarga y exportación masiva).
+
+Los procesos se crean con spawn e importan solo este módulo: sin pandas ni numpy,
+y las filas llegan como tuplas (ver jobs.report_rows). fpdf y el logo se cargan
+con la primera llamada.
+"""
+
+
+def load_report_assets():
+    """Inicializador de los pools de PDF: importa fpdf y decodifica el logo."""
+    from app.reports import load_assets
+    load_assets()
+
+
+def render_report(rows, client_id, vendedor, month_column):
+    """Genera el PDF de un cliente a partir de las tuplas de report_rows."""
+    from app.reports import render_client_report
+    load_report_assets()
+    return render_client_report(rows, client_id, vendedor, month_column)
+
+
+def render_partition(client_id, vendedor, rows, month_column):
+    # Exportación masiva: devuelve también la clave para armar el nombre del archivo
+    return client_id, vendedor, render_report(rows, client_id, vendedor, month_column)
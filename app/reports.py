@@ -0,0 +1,86 @@
+import os
+from datetime import datetime
+
+from fpdf import FPDF
+
+# Logo del encabezado del reporte
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'Azul.png')
+
+REPORT_COLUMN_WIDTHS = [25, 25, 70, 30, 85, 20]
+
+
+class ReportPDF(FPDF):
+    """FPDF que reutiliza imágenes ya decodificadas en lugar de leerlas en cada reporte."""
+
+    _parsed_images = {}
+
+    @classmethod
+    def preload_image(cls, path):
+        # fpdf 1.7 guarda las imágenes decodificadas en self.images; se decodifica una vez
+        if path in cls._parsed_images or not os.path.exists(path) or not hasattr(FPDF, '_parsepng'):
+            return
+        cls._parsed_images[path] = FPDF()._parsepng(path)
+
+    def image(self, name, *args, **kwargs):
+        info = self._parsed_images.get(name)
+        if info is not None and name not in self.images:
+            self.images[name] = dict(info, i=len(self.images) + 1)
+        return super().image(name, *args, **kwargs)
+
+
+def load_assets():
+    ReportPDF.preload_image(LOGO_PATH)
+
+
+def render_client_report(rows, client_id, vendedor, month_column, now=None):
+    """Genera en memoria el PDF con las filas filtradas de un cliente y devuelve sus bytes.
+
+    rows: tuplas (Vendedor, Cliente, Categoria, Material, Descripcion, valor del mes).
+    """
+    now = now or datetime.now()
+
+    pdf = ReportPDF(orientation='L', unit='mm', format='A4')
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    pdf.set_font("Arial", style="B", size=14)
+    pdf.cell(0, 10, f"Reporte de Datos Filtrados - {now.strftime('%B %Y')}", ln=True, align="C")
+    pdf.ln(10)
+
+    # Insertar PNG en el encabezado
+    if os.path.exists(LOGO_PATH):
+        pdf.image(LOGO_PATH, x=10, y=8, w=30)  # Ajustar posición y tamaño del PNG
+
+    pdf.set_font("Arial", style="B", size=12)
+    pdf.cell(0, 10, "Información General", ln=True, align="L")
+    pdf.set_font("Arial", size=10)
+    pdf.cell(50, 10, f"Vendedor: {vendedor}", ln=True)
+    pdf.cell(50, 10, f"Cliente: {client_id}", ln=True)
+    pdf.ln(10)
+
+    pdf.set_font("Arial", style="B", size=12)
+    pdf.cell(0, 10, "Datos Filtrados", ln=True, align="L")
+    pdf.ln(5)
+
+    column_widths = REPORT_COLUMN_WIDTHS
+    headers = ['Vendedor', 'Cliente', 'Categoria', 'Material', 'Descripcion', month_column]
+    pdf.set_font("Arial", style="B", size=10)
+    for i, header in enumerate(headers):
+        pdf.cell(column_widths[i], 10, header, border=1, align="C")
+    pdf.ln()
+
+    pdf.set_font("Arial", size=10)
+    for vend, cliente, categoria, material, descripcion, value in rows:
+        pdf.cell(column_widths[0], 10, str(vend), border=1, align="C")
+        pdf.cell(column_widths[1], 10, str(cliente), border=1, align="C")
+        pdf.cell(column_widths[2], 10, str(categoria), border=1, align="L")
+        pdf.cell(column_widths[3], 10, str(material), border=1, align="C")
+        pdf.cell(column_widths[4], 10, str(descripcion), border=1, align="L")
+        pdf.cell(column_widths[5], 10, f"{value:.2f}", border=1, align="C")
+        pdf.ln()
+
+    output = pdf.output(dest='S')
+    # fpdf 1.7 devuelve str (latin-1); fpdf2 devuelve bytearray
+    if isinstance(output, str):
+        return output.encode('latin-1')
+    return bytes(output)
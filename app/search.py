@@ -0,0 +1,111 @@
+"""Búsqueda de clientes por prefijo para el autocompletado del formulario.
+
+Al cargar la base se arma una lista ordenada de claves (el ID del cliente, el ID
+sin ceros a la izquierda y cada palabra del Nombre) con el cliente al que
+apuntan. Buscar un prefijo es una bisección sobre esa lista y un recorrido
+corto hasta juntar `limit` resultados; hay una lista por vendedor para filtrar
+sin recorrer los clientes de los demás.
+"""
+import unicodedata
+from bisect import bisect_left
+
+import pandas as pd
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Mayor que cualquier carácter que pueda seguir al prefijo
+_PREFIX_END = '\U0010ffff'
+
+
+def normalize(text):
+    """Minúsculas y sin tildes, para que "peña" encuentre "PENA" y viceversa."""
+    text = unicodedata.normalize('NFKD', str(text).strip().lower())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def client_keys(cliente, nombre):
+    keys = {normalize(cliente)}
+    stripped = cliente.lstrip('0')
+    if stripped:
+        keys.add(normalize(stripped))
+    keys.update(normalize(nombre).split())
+    return keys
+
+
+class _PrefixArray:
+    """Claves ordenadas con el cliente de cada una (arreglos paralelos)."""
+
+    def __init__(self, entries):
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.ids = [client for _, client in entries]
+
+    def range(self, prefix):
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + _PREFIX_END)
+
+
+class ClientSearchIndex:
+    def __init__(self, clients):
+        # clients: [(cliente, vendedor, nombre)] una vez por par cliente/vendedor
+        # Un Nombre vacío en la base llega como NaN: no debe indexarse como "nan"
+        self.clients = [(str(cliente), str(vendedor), '' if pd.isna(nombre) else str(nombre))
+                        for cliente, vendedor, nombre in clients]
+        self._tokens = []
+        entries = []
+        by_vendor = {}
+        for client, (cliente, vendedor, nombre) in enumerate(self.clients):
+            keys = client_keys(cliente, nombre)
+            self._tokens.append(keys)
+            pairs = [(key, client) for key in keys]
+            entries.extend(pairs)
+            by_vendor.setdefault(vendedor, []).extend(pairs)
+        self._all = _PrefixArray(entries)
+        self._by_vendor = {vendedor: _PrefixArray(pairs) for vendedor, pairs in by_vendor.items()}
+
+    @classmethod
+    def from_snapshot(cls, df, client_index):
+        """Un registro por par (Cliente, Vendedor) del índice del catálogo."""
+        pairs = list(client_index)
+        if 'Nombre' in df.columns and pairs:
+            first_rows = [positions[0] for positions in client_index.values()]
+            names = df['Nombre'].to_numpy()[first_rows]
+        else:
+            names = [''] * len(pairs)
+        return cls((cliente, vendedor, nombre) for (cliente, vendedor), nombre in zip(pairs, names))
+
+    def __len__(self):
+        return len(self.clients)
+
+    def search(self, query, vendedor=None, limit=DEFAULT_LIMIT):
+        """Clientes cuyo ID o alguna palabra del Nombre empieza con cada término de `query`."""
+        terms = normalize(query).split()
+        if not terms or limit <= 0:
+            return []
+
+        index = self._all if vendedor is None else self._by_vendor.get(vendedor)
+        if index is None:
+            return []
+
+        # Recorrer el término con menos coincidencias y verificar los demás
+        ranges = sorted((index.range(term) + (term,) for term in terms), key=lambda r: r[1] - r[0])
+        start, end, _ = ranges[0]
+        others = [term for _, _, term in ranges[1:]]
+
+        results = []
+        seen = set()
+        for position in range(start, end):
+            client = index.ids[position]
+            if client in seen:
+                continue
+            seen.add(client)
+            tokens = self._tokens[client]
+            if all(any(token.startswith(term) for token in tokens) for term in others):
+                results.append(client)
+                if len(results) >= limit:
+                    break
+
+        return [
+            {"cliente": cliente, "vendedor": vendedor, "nombre": nombre}
+            for cliente, vendedor, nombre in (self.clients[client] for client in results)
+        ]
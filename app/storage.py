@@ -0,0 +1,295 @@
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from app.orders import LegacyOrderFiles, OrderConflictError, version_of
+
+logger = logging.getLogger(__name__)
+
+# Columnas de los productos agregados manualmente por cliente/vendedor
+ADDED_PRODUCTS_COLUMNS = [
+    'Cliente', 'Vendedor', 'Categoria', 'Descripcion', 'Cantidad',
+    'Factor', 'Material', 'Presentacion', 'Embalaje'
+]
+
+# Columnas de cada línea de pedido (las que envía result.html al guardar)
+ORDER_COLUMNS = [
+    'categoria', 'material', 'descripcion', 'presentacion', 'embalaje',
+    'referencia', 'pedido1', 'pedido2', 'total'
+]
+
+
+@contextmanager
+def connect(path):
+    """Conexión SQLite en modo WAL; el bloqueo entre procesos lo maneja SQLite."""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class AddedProductsStore:
+    """Productos agregados, indexados por (Cliente, Vendedor, Categoria, Descripcion)."""
+
+    def __init__(self, path, legacy_csv=None):
+        self.path = path
+        self.legacy_csv = legacy_csv
+
+    def initialize(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with connect(self.path) as conn:
+            # IMMEDIATE: si varios workers arrancan a la vez solo uno hace la migración
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS added_products (
+                    Cliente TEXT NOT NULL,
+                    Vendedor TEXT NOT NULL,
+                    Categoria TEXT NOT NULL,
+                    Descripcion TEXT NOT NULL,
+                    Cantidad INTEGER NOT NULL,
+                    Factor TEXT,
+                    Material TEXT,
+                    Presentacion TEXT,
+                    Embalaje TEXT,
+                    PRIMARY KEY (Cliente, Vendedor, Categoria, Descripcion)
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'legacy_csv_imported'").fetchone()
+            if imported is None:
+                self._import_legacy_csv(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_csv_imported', '1')")
+
+    def _import_legacy_csv(self, conn):
+        # Migración única desde el antiguo added_products.csv
+        if not self.legacy_csv or not os.path.exists(self.legacy_csv) or os.path.getsize(self.legacy_csv) == 0:
+            return
+        legacy_df = pd.read_csv(self.legacy_csv, dtype=str)
+        skipped = 0
+        for line, row in enumerate(legacy_df.itertuples(index=False), start=2):
+            record = row._asdict()
+            product = {col: record.get(col) for col in ADDED_PRODUCTS_COLUMNS}
+            # Filas sin clave o con Cantidad vacía o no numérica no se importan
+            keys = [product[col] for col in ('Cliente', 'Vendedor', 'Categoria', 'Descripcion')]
+            quantity = pd.to_numeric(product['Cantidad'], errors='coerce')
+            if any(pd.isna(key) for key in keys) or pd.isna(quantity):
+                logger.warning("Fila %s de %s ignorada en la importación: %s", line, self.legacy_csv, product)
+                skipped += 1
+                continue
+            self._upsert(conn, dict(product, Cantidad=int(quantity)))
+        if skipped:
+            logger.warning("%s filas de %s no se importaron", skipped, self.legacy_csv)
+
+    @staticmethod
+    def _upsert(conn, product):
+        conn.execute("""
+            INSERT INTO added_products (Cliente, Vendedor, Categoria, Descripcion, Cantidad, Factor, Material, Presentacion, Embalaje)
+            VALUES (:Cliente, :Vendedor, :Categoria, :Descripcion, :Cantidad, :Factor, :Material, :Presentacion, :Embalaje)
+            ON CONFLICT (Cliente, Vendedor, Categoria, Descripcion)
+            DO UPDATE SET Cantidad = Cantidad + excluded.Cantidad
+        """, dict(product, Cantidad=int(product['Cantidad'])))
+
+    def add(self, product):
+        """Suma la cantidad si el producto ya existe para el cliente; si no, lo inserta."""
+        with connect(self.path) as conn:
+            self._upsert(conn, product)
+
+    def version(self, client_id, vendedor):
+        """(cantidad de productos, suma de Cantidad) del cliente; cambia con cada add."""
+        with connect(self.path) as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), TOTAL(Cantidad) FROM added_products WHERE Cliente = ? AND Vendedor = ?",
+                (client_id, vendedor)
+            ).fetchone()
+        return (count, total)
+
+    def for_client(self, client_id, vendedor):
+        with connect(self.path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT * FROM added_products WHERE Cliente = ? AND Vendedor = ? ORDER BY rowid",
+                (client_id, vendedor)
+            ).fetchall()
+        return [{col: row[col] for col in ADDED_PRODUCTS_COLUMNS} for row in rows]
+
+
+class OrderBook:
+    """Pedidos de todos los clientes en una sola base SQLite (data/orders/orders.db).
+
+    Lectura y guardado por (cliente, vendedor) con una versión por par para
+    detectar escrituras concurrentes. La clave primaria
+    (cliente, vendedor, material) y el índice por material permiten sumar la
+    demanda de todos los clientes con una sola consulta.
+    """
+
+    def __init__(self, path, legacy_folder=None):
+        self.path = path
+        self.legacy_folder = legacy_folder
+
+    def initialize(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with connect(self.path) as conn:
+            # IMMEDIATE: si varios workers arrancan a la vez solo uno hace la migración
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS orders (
+                    cliente TEXT NOT NULL,
+                    vendedor TEXT NOT NULL,
+                    material TEXT NOT NULL,
+                    categoria TEXT,
+                    descripcion TEXT,
+                    presentacion TEXT,
+                    embalaje TEXT,
+                    referencia NUMERIC,
+                    pedido1 NUMERIC,
+                    pedido2 NUMERIC,
+                    total NUMERIC,
+                    fecha_actualizacion TEXT,
+                    PRIMARY KEY (cliente, vendedor, material)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS orders_material ON orders (material)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS order_versions (
+                    cliente TEXT NOT NULL,
+                    vendedor TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    PRIMARY KEY (cliente, vendedor)
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'legacy_orders_imported'").fetchone()
+            if imported is None:
+                self._import_legacy_csv(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_orders_imported', '1')")
+
+    def _import_legacy_csv(self, conn):
+        # Migración única desde los latest_orders_{cliente}_{vendedor}.csv (quedan en su carpeta)
+        if not self.legacy_folder:
+            return
+        legacy = LegacyOrderFiles(self.legacy_folder)
+        for client_id, vendedor, path in legacy.pairs():
+            orders_df = legacy.load(path)
+            version = max(version_of(orders_df), 1)
+            updated_at = None
+            if 'fecha_actualizacion' in orders_df.columns and not orders_df.empty:
+                updated_at = orders_df['fecha_actualizacion'].iloc[-1]
+            records = orders_df.to_dict(orient='records')
+            self._write_lines(conn, client_id, vendedor, records, updated_at)
+            self._set_version(conn, client_id, vendedor, version)
+
+    @staticmethod
+    def _clean(value):
+        return None if value is None or (isinstance(value, float) and pd.isna(value)) else value
+
+    def _write_lines(self, conn, client_id, vendedor, orders, updated_at):
+        conn.executemany("""
+            INSERT OR REPLACE INTO orders (cliente, vendedor, material, categoria, descripcion, presentacion,
+                                           embalaje, referencia, pedido1, pedido2, total, fecha_actualizacion)
+            VALUES (:cliente, :vendedor, :material, :categoria, :descripcion, :presentacion,
+                    :embalaje, :referencia, :pedido1, :pedido2, :total, :fecha_actualizacion)
+        """, [
+            dict(
+                {col: self._clean(order.get(col)) for col in ORDER_COLUMNS},
+                material=str(self._clean(order.get('material')) or ''),
+                cliente=client_id, vendedor=vendedor, fecha_actualizacion=updated_at
+            )
+            for order in orders
+        ])
+
+    @staticmethod
+    def _set_version(conn, client_id, vendedor, version):
+        conn.execute("""
+            INSERT INTO order_versions (cliente, vendedor, version) VALUES (?, ?, ?)
+            ON CONFLICT (cliente, vendedor) DO UPDATE SET version = excluded.version
+        """, (client_id, vendedor, version))
+
+    @staticmethod
+    def _current_version(conn, client_id, vendedor):
+        row = conn.execute(
+            "SELECT version FROM order_versions WHERE cliente = ? AND vendedor = ?", (client_id, vendedor)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def filename(self, client_id, vendedor):
+        return os.path.basename(self.path)
+
+    def load(self, client_id, vendedor):
+        """Devuelve (pedidos como DataFrame, versión guardada).
+
+        Si el par nunca guardó devuelve (None, 0). La versión se lee en la misma
+        conexión que las filas y vale aunque el último guardado no tenga líneas.
+        """
+        with connect(self.path) as conn:
+            version = self._current_version(conn, client_id, vendedor)
+            if version is None:
+                return None, 0
+            rows = conn.execute(
+                "SELECT " + ", ".join(ORDER_COLUMNS) + ", fecha_actualizacion FROM orders "
+                "WHERE cliente = ? AND vendedor = ? ORDER BY rowid",
+                (client_id, vendedor)
+            ).fetchall()
+        orders_df = pd.DataFrame(rows, columns=ORDER_COLUMNS + ['fecha_actualizacion'])
+        orders_df['material'] = orders_df['material'].astype(str)
+        orders_df['cliente'] = client_id
+        orders_df['vendedor'] = vendedor
+        return orders_df, version
+
+    def signature(self, client_id, vendedor):
+        """Versión guardada del par (cambia con cada guardado), o None si no hay pedidos."""
+        with connect(self.path) as conn:
+            return self._current_version(conn, client_id, vendedor)
+
+    def save(self, client_id, vendedor, orders, delta=False, expected_version=None):
+        """Guarda los pedidos y devuelve la nueva versión.
+
+        Con delta=True solo se envían los materiales modificados y se combinan con
+        los guardados. Si expected_version no coincide con la versión guardada se
+        lanza OrderConflictError.
+        """
+        with connect(self.path) as conn:
+            # Lectura de la versión y escritura en la misma transacción
+            conn.execute("BEGIN IMMEDIATE")
+            current_version = self._current_version(conn, client_id, vendedor) or 0
+            if expected_version is not None and int(expected_version) != current_version:
+                raise OrderConflictError(current_version)
+
+            if not delta:
+                conn.execute("DELETE FROM orders WHERE cliente = ? AND vendedor = ?", (client_id, vendedor))
+            self._write_lines(conn, client_id, vendedor, orders, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+            new_version = current_version + 1
+            self._set_version(conn, client_id, vendedor, new_version)
+            return new_version
+
+    def demand(self, vendedor=None, categoria=None):
+        """Pedido1, Pedido2 y Total pendientes por material, sumados sobre todos los clientes."""
+        conditions = []
+        params = []
+        if vendedor is not None:
+            conditions.append("vendedor = ?")
+            params.append(vendedor)
+        if categoria is not None:
+            conditions.append("categoria = ?")
+            params.append(categoria)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+        with connect(self.path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"""
+                SELECT material, MAX(categoria) AS categoria, MAX(descripcion) AS descripcion,
+                       TOTAL(pedido1) AS pedido1, TOTAL(pedido2) AS pedido2, TOTAL(total) AS total,
+                       COUNT(*) AS clientes
+                FROM orders {where}
+                GROUP BY material
+                ORDER BY material
+            """, params).fetchall()
+        return [dict(row) for row in rows]
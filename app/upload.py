@@ -0,0 +1,116 @@
+"""Carga de una nueva base de ventas (CSV o XLSX) y reemplazo atómico de la vigente.
+
+El archivo se copia a disco por bloques, se valida el encabezado una sola vez, se
+normaliza y se construyen los índices del catálogo antes de reemplazar el archivo
+vigente con un rename. Las peticiones en curso siguen usando el snapshot anterior.
+"""
+import csv
+import fcntl
+import os
+import tempfile
+import time
+
+from app.ingest import REQUIRED_COLUMNS, read_csv_base, source_signature, write_binary
+from app.months import MonthIndex
+
+CHUNK_SIZE = 1024 * 1024
+
+ALLOWED_EXTENSIONS = {'.csv', '.xlsx'}
+
+
+class UploadError(ValueError):
+    """El archivo subido no es válido; el mensaje se devuelve al cliente."""
+
+
+def stream_to_disk(stream, folder, suffix):
+    """Copia el stream a un archivo temporal en `folder` por bloques y devuelve su ruta."""
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.upload_', suffix=suffix)
+    with os.fdopen(fd, 'wb') as temp_file:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            temp_file.write(chunk)
+    return temp_path
+
+
+def xlsx_to_csv(xlsx_path, csv_path):
+    """Convierte la primera hoja a CSV fila por fila (openpyxl en modo solo lectura)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            for row in sheet.iter_rows(values_only=True):
+                writer.writerow(['' if value is None else value for value in row])
+    finally:
+        workbook.close()
+
+
+def validate_header(csv_path):
+    with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+        header = [col.strip() for col in next(csv.reader(csv_file), [])]
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing_columns:
+        raise UploadError(f"El archivo no contiene las columnas requeridas: {missing_columns}")
+    if not len(MonthIndex.from_columns(header)):
+        raise UploadError("El archivo no contiene columnas de meses reconocibles.")
+
+
+def import_base(stream, filename, catalog):
+    """Importa la base subida y la deja vigente. Devuelve el estado del nuevo snapshot."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in ALLOWED_EXTENSIONS:
+        raise UploadError(f"Formato no soportado: '{extension}'. Use CSV o XLSX.")
+
+    target = catalog.path
+    folder = os.path.dirname(target) or '.'
+    os.makedirs(folder, exist_ok=True)
+
+    # Una sola importación a la vez entre todos los workers
+    with open(os.path.join(folder, '.upload.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        temp_paths = []
+        try:
+            upload_path = stream_to_disk(stream, folder, extension)
+            temp_paths.append(upload_path)
+            if extension == '.xlsx':
+                fd, csv_path = tempfile.mkstemp(dir=folder, prefix='.upload_', suffix='.csv')
+                os.close(fd)
+                temp_paths.append(csv_path)
+                xlsx_to_csv(upload_path, csv_path)
+            else:
+                csv_path = upload_path
+
+            validate_header(csv_path)
+
+            start = time.perf_counter()
+            df = read_csv_base(csv_path)
+            if df.empty:
+                raise UploadError("El archivo no contiene filas.")
+
+            # El rename conserva mtime y tamaño, así que la firma es la del archivo final
+            signature = source_signature(csv_path)
+            stat = os.stat(csv_path)
+            snapshot = catalog.build(df, (stat.st_mtime_ns, stat.st_size), time.perf_counter() - start, 'upload')
+
+            # mkstemp crea el archivo solo legible por el dueño
+            os.chmod(csv_path, 0o644)
+            os.replace(csv_path, target)
+            temp_paths.remove(csv_path)
+            catalog.install(snapshot)
+
+            try:
+                write_binary(df, target, signature)
+            except (OSError, RuntimeError):
+                # Sin copia binaria los demás workers leerán el CSV
+                pass
+            return snapshot.status()
+        finally:
+            for path in temp_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,137 @@
+"""Latencia de las rutas livianas mientras se generan varios PDFs a la vez.
+
+Levanta gunicorn con un solo worker sobre una base sintética y mide
+/get_products en reposo y con N descargas de PDF simultáneas, en dos modos:
+
+    sync     worker sync, PDF en el hilo de la petición (configuración anterior)
+    gthread  gunicorn.conf.py: worker gthread y PDFs en el pool de procesos
+
+Termina con código 1 si en modo gthread el p95 de /get_products bajo carga
+supera --max-p95-ms.
+
+Uso:
+    python -m benchmarks.bench_concurrency --rows 100000 --pdf-clients 4
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.bench_routes import GunicornTarget, build_request, load_samples, prepare_workdir
+
+MODES = {
+    'sync': {"worker_class": 'sync', "threads": 1, "env": {'PDF_WORKERS': '0'}},
+    'gthread': {"worker_class": None, "threads": 8, "env": {'PDF_WORKERS': '2'}},
+}
+
+
+def percentiles(latencies):
+    values = np.array(latencies) * 1000
+    if not len(values):
+        return {"requests": 0}
+    return {
+        "requests": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def measure_light(target, samples, requests, rng):
+    latencies = []
+    for _ in range(requests):
+        request = build_request('get_products', samples, rng)
+        start = time.perf_counter()
+        target.send(*request)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_mode(mode, workdir, samples, pdf_clients, requests, seed):
+    settings = MODES[mode]
+    target = GunicornTarget(workdir, workers=1, threads=settings["threads"],
+                            worker_class=settings["worker_class"], env=settings["env"])
+    try:
+        rng = random.Random(seed)
+        target.send(*build_request('download_filtered_data', samples, rng))
+        measure_light(target, samples, 20, rng)
+        idle = measure_light(target, samples, requests, rng)
+
+        # Descargas continuas de PDFs de clientes distintos (sin caché) mientras se mide
+        stop = threading.Event()
+        pdf_latencies = []
+        pairs = list(samples["pairs"])
+
+        def download_loop(worker):
+            position = worker
+            while not stop.is_set():
+                client_id, vendedor = pairs[position % len(pairs)]
+                position += pdf_clients
+                start = time.perf_counter()
+                target.send('POST', '/download_filtered_data', {'client_id': client_id, 'vendedor': vendedor}, None)
+                pdf_latencies.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=download_loop, args=(i,), daemon=True) for i in range(pdf_clients)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        loaded = measure_light(target, samples, requests, rng)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        target.close()
+
+    return {
+        "idle": percentiles(idle),
+        "under_pdf_load": percentiles(loaded),
+        "pdf": percentiles(pdf_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rutas livianas con PDFs generándose en paralelo.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--data', default=None, help="usar esta base en lugar de generar una")
+    parser.add_argument('--pdf-clients', type=int, default=4, help="descargas de PDF simultáneas")
+    parser.add_argument('--requests', type=int, default=100, help="peticiones a /get_products por medición")
+    parser.add_argument('--modes', default='sync,gthread')
+    parser.add_argument('--max-p95-ms', type=float, default=100.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="guardar el resultado en JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='adheplast_bench_')
+    try:
+        csv_path = prepare_workdir(workdir, args.rows, args.seed, args.data and os.path.abspath(args.data))
+        samples = load_samples(csv_path, args.seed)
+
+        results = {}
+        print(f"{'modo':<8} {'reposo p95':>11} {'carga p50':>10} {'carga p95':>10} {'PDF p50':>9} {'PDFs':>6}")
+        for mode in [mode.strip() for mode in args.modes.split(',') if mode.strip()]:
+            result = run_mode(mode, workdir, samples, args.pdf_clients, args.requests, args.seed)
+            results[mode] = result
+            print(f"{mode:<8} {result['idle']['p95_ms']:>11.2f} {result['under_pdf_load']['p50_ms']:>10.2f} "
+                  f"{result['under_pdf_load']['p95_ms']:>10.2f} {result['pdf'].get('p50_ms', 0):>9.2f} "
+                  f"{result['pdf']['requests']:>6}")
+
+        if args.output:
+            with open(args.output, 'w') as output_file:
+                json.dump({"rows": args.rows, "pdf_clients": args.pdf_clients, "modes": results}, output_file, indent=2)
+
+        if 'gthread' in results and results['gthread']['under_pdf_load']['p95_ms'] > args.max_p95_ms:
+            print(f"FALLA: p95 de /get_products bajo carga > {args.max_p95_ms} ms")
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Compara la agrupación fila por fila (iterrows) con group_client_rows.
+
+Uso:
+    python -m benchmarks.bench_grouping
+"""
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from app.analysis import group_client_rows
+
+CURRENT_MONTH = "Oct-24"
+NEXT_YEAR_MONTH = "Oct-25"
+MONTHS = [f"{m}-{y}" for y in (24, 25) for m in ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]]
+SIZES = [10 ** 2, 10 ** 4, 10 ** 5]
+
+
+def legacy_group(filtered_rows, orders_df, current_month, next_year_month):
+    """Implementación original de analyze_client_data, usada como referencia."""
+    orders_dict = {}
+    if orders_df is not None:
+        for _, order_row in orders_df.iterrows():
+            orders_dict[order_row['material']] = {
+                'pedido1': order_row['pedido1'],
+                'pedido2': order_row['pedido2'],
+                'total': order_row['total']
+            }
+
+    grouped_data = defaultdict(list)
+    for index, row in filtered_rows.iterrows():
+        current_month_value = row.get(current_month, 0)
+        next_year_month_value = row.get(next_year_month, 0)
+        if pd.isna(current_month_value) or current_month_value == 0:
+            continue
+        row_dict = row.to_dict()
+        row_dict['unique_id'] = f"{row['Categoria']}-{index}"
+        row_dict['Filtered Months'] = {
+            current_month: current_month_value,
+            next_year_month: next_year_month_value if not pd.isna(next_year_month_value) else 0
+        }
+        if row['Material'] in orders_dict:
+            row_dict['Pedido1'] = orders_dict[row['Material']]['pedido1']
+            row_dict['Pedido2'] = orders_dict[row['Material']]['pedido2']
+            row_dict['Total'] = orders_dict[row['Material']]['total']
+            row_dict['has_saved_order'] = True
+        else:
+            row_dict['Pedido1'] = 0
+            row_dict['Pedido2'] = 0
+            row_dict['Total'] = 0
+            row_dict['has_saved_order'] = False
+        grouped_data[row['Categoria']].append(row_dict)
+    return grouped_data
+
+
+def make_client_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    materials = [f"MAT{i:05d}" for i in range(max(n // 2, 1))]
+    df = pd.DataFrame({
+        'Vendedor': pd.Categorical(['001'] * n),
+        'Cliente': pd.Categorical(['0020000000'] * n),
+        'Nombre': pd.Categorical(['CLIENTE DE PRUEBA'] * n),
+        'Categoria': pd.Categorical(rng.choice([f"CATEGORIA {i}" for i in range(20)], n)),
+        'Material': pd.Categorical(rng.choice(materials, n)),
+        'Descripcion': [f"PRODUCTO {i}" for i in range(n)],
+        'Presentacion': ['LITRO'] * n,
+        'Embalaje': ['CAJA 6 UN'] * n,
+        'Factor': rng.choice(['1', '6', '12'], n),
+    })
+    for month in MONTHS:
+        values = rng.uniform(1, 30, n).round(1)
+        values[rng.random(n) < 0.5] = 0
+        df[month] = values
+    for col in ['Pedido1', 'Pedido2', 'Total']:
+        df[col] = 0.0
+
+    ordered = rng.choice(materials, max(len(materials) // 4, 1), replace=False)
+    orders_df = pd.DataFrame({
+        'material': ordered,
+        'pedido1': rng.integers(0, 10, len(ordered)),
+        'pedido2': rng.integers(0, 10, len(ordered)),
+    })
+    orders_df['total'] = orders_df['pedido1'] + orders_df['pedido2']
+    return df, orders_df
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print(f"{'filas':>8} {'iterrows (s)':>14} {'vectorizado (s)':>16} {'mejora':>8}")
+    for n in SIZES:
+        rows, orders_df = make_client_rows(n)
+        repeat = 1 if n >= 10 ** 5 else 3
+        legacy_time, expected = timed(legacy_group, rows, orders_df, CURRENT_MONTH, NEXT_YEAR_MONTH, repeat=repeat)
+        new_time, result = timed(group_client_rows, rows, orders_df, CURRENT_MONTH, NEXT_YEAR_MONTH, repeat=repeat)
+        assert dict(expected) == result, f"La salida difiere con {n} filas"
+        print(f"{n:>8} {legacy_time:>14.4f} {new_time:>16.4f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+"""Prueba de carga de las rutas principales sobre una base sintética.
+
+Recorre /analyze, /get_products, /products_by_category, /add_product,
+/save_orders y /download_filtered_data con el cliente de pruebas de Flask (en
+proceso) o contra un gunicorn local, y reporta latencia p50/p95/p99, throughput
+y RSS máximo. El resultado se puede guardar en JSON y comparar con una corrida
+anterior.
+
+La base y los archivos de data/ se generan en un directorio temporal, así la
+prueba no toca los datos reales.
+
+Uso:
+    python -m benchmarks.bench_routes --rows 100000 --requests 200
+    python -m benchmarks.bench_routes --target gunicorn --workers 4 --concurrency 8 --output actual.json
+    python -m benchmarks.bench_routes --compare anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import generate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = ['analyze', 'get_products', 'products_by_category', 'add_product', 'save_orders', 'download_filtered_data']
+
+
+def prepare_workdir(workdir, rows, seed, data=None):
+    """Crea data/uploaded_files/Basesdedatos.csv en `workdir` (generada o copiada)."""
+    target = os.path.join(workdir, 'data', 'uploaded_files', 'Basesdedatos.csv')
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if data:
+        shutil.copyfile(data, target)
+    else:
+        generate(target, rows=rows, seed=seed)
+    return target
+
+
+def load_samples(csv_path, seed, clients=200):
+    """Clientes, categorías y productos de la base para armar las peticiones."""
+    columns = ['Vendedor', 'Cliente', 'Categoria', 'Material', 'Descripcion', 'Factor']
+    df = pd.read_csv(csv_path, dtype=str, usecols=columns)
+    rng = random.Random(seed)
+
+    pairs = df[['Cliente', 'Vendedor']].drop_duplicates()
+    pairs = [tuple(pair) for pair in pairs.itertuples(index=False)]
+    pairs = rng.sample(pairs, min(clients, len(pairs)))
+
+    products = df.drop_duplicates(subset=['Categoria', 'Descripcion'])
+    products = [tuple(row) for row in products[['Categoria', 'Descripcion', 'Factor']].itertuples(index=False)]
+
+    materials = df.groupby(['Cliente', 'Vendedor'])[['Categoria', 'Material']].apply(
+        lambda rows: list(rows.head(20).itertuples(index=False, name=None)))
+    return {
+        "rows": len(df),
+        "pairs": pairs,
+        "categories": sorted(df['Categoria'].unique()),
+        "products": products,
+        "materials": {pair: materials[pair] for pair in pairs},
+    }
+
+
+def build_request(route, samples, rng):
+    """(método, ruta, form, json) de una petición al azar para la ruta indicada."""
+    client_id, vendedor = rng.choice(samples["pairs"])
+    if route == 'analyze':
+        return 'POST', '/analyze', {'client_id': client_id, 'vendedor': vendedor}, None
+    if route == 'get_products':
+        return 'GET', '/get_products?' + urllib.parse.urlencode({'categoria': rng.choice(samples["categories"])}), None, None
+    if route == 'products_by_category':
+        return 'GET', '/products_by_category?' + urllib.parse.urlencode({'categoria': rng.choice(samples["categories"])}), None, None
+    if route == 'add_product':
+        categoria, descripcion, factor = rng.choice(samples["products"])
+        form = {
+            'categoria': categoria,
+            'producto': descripcion,
+            'cantidad': str(int(float(factor)) * rng.randint(1, 5)),
+            'client_id': client_id,
+            'vendedor': vendedor,
+        }
+        return 'POST', '/add_product', form, None
+    if route == 'save_orders':
+        orders = []
+        for categoria, material in samples["materials"][(client_id, vendedor)][:rng.randint(1, 10)]:
+            pedido1, pedido2 = rng.randint(0, 20), rng.randint(0, 20)
+            orders.append({'categoria': categoria, 'material': material,
+                           'pedido1': pedido1, 'pedido2': pedido2, 'total': pedido1 + pedido2})
+        # delta: cada petición agrega o actualiza sus materiales sin pisar al resto
+        return 'POST', '/save_orders', None, {'client_id': client_id, 'vendedor': vendedor, 'orders': orders, 'delta': True}
+    if route == 'download_filtered_data':
+        return 'POST', '/download_filtered_data', {'client_id': client_id, 'vendedor': vendedor}, None
+    raise ValueError(route)
+
+
+class FlaskClientTarget:
+    """Peticiones en proceso con app.test_client() (sin red ni gunicorn)."""
+
+    def __init__(self, workdir):
+        os.chdir(workdir)
+        sys.path.insert(0, REPO_ROOT)
+        from app.main import app
+        self.client = app.test_client()
+
+    def send(self, method, path, form, payload):
+        if method == 'GET':
+            response = self.client.get(path)
+        else:
+            response = self.client.post(path, data=form, json=payload)
+        response.get_data()
+        return response.status_code
+
+    def warm_up(self):
+        self.client.get('/catalog_status')
+        self.client.get('/get_products?categoria=_')
+
+    def peak_rss_kb(self):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def close(self):
+        pass
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children_file:
+            return [int(child) for child in children_file.read().split()]
+    except OSError:
+        return []
+
+
+def _peak_rss_kb(pid):
+    # VmHWM: RSS máximo del proceso (Linux)
+    try:
+        with open(f'/proc/{pid}/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class GunicornTarget:
+    """Peticiones HTTP reales contra un gunicorn lanzado en `workdir`."""
+
+    def __init__(self, workdir, workers=2, threads=1, timeout=120, worker_class=None, env=None):
+        self.port = _free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, **(env or {}))
+        # Con la configuración del repo (gunicorn.conf.py); los argumentos la sobrescriben
+        command = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(REPO_ROOT, 'gunicorn.conf.py'), 'app.main:app',
+                   '-b', f'127.0.0.1:{self.port}', '--workers', str(workers), '--threads', str(threads),
+                   '--timeout', str(timeout)]
+        if worker_class:
+            command += ['--worker-class', worker_class]
+        self.process = subprocess.Popen(command, cwd=workdir, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._peak_rss = {}
+        self._wait_until_ready(timeout)
+
+    def _wait_until_ready(self, timeout):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("gunicorn terminó antes de quedar disponible")
+            try:
+                urllib.request.urlopen(self.base_url + '/catalog_status', timeout=5).read()
+                return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+        raise RuntimeError("gunicorn no respondió a tiempo")
+
+    def send(self, method, path, form, payload):
+        headers = {}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        elif form is not None:
+            body = urllib.parse.urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=300) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def warm_up(self):
+        # Una petición por worker para que todos carguen la base antes de medir
+        for _ in range(len(_children(self.process.pid)) * 2 or 1):
+            self.send('GET', '/get_products?categoria=_', None, None)
+        self.sample_rss()
+
+    def sample_rss(self):
+        for pid in [self.process.pid] + _children(self.process.pid):
+            self._peak_rss[pid] = max(self._peak_rss.get(pid, 0), _peak_rss_kb(pid))
+
+    def peak_rss_kb(self):
+        self.sample_rss()
+        # Suma de los máximos de cada proceso (master + workers)
+        return sum(self._peak_rss.values())
+
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def summarize(latencies, statuses, elapsed):
+    values = np.array(latencies) * 1000
+    errors = sum(1 for status in statuses if status >= 500)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "status_codes": {str(code): statuses.count(code) for code in sorted(set(statuses))},
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else None,
+    }
+
+
+def run_route(target, route, samples, requests, concurrency, seed):
+    rng = random.Random(f"{seed}-{route}")
+    batch = [build_request(route, samples, rng) for _ in range(requests)]
+
+    def timed(request):
+        start = time.perf_counter()
+        status = target.send(*request)
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, batch))
+    else:
+        results = [timed(request) for request in batch]
+    elapsed = time.perf_counter() - start
+
+    if hasattr(target, 'sample_rss'):
+        target.sample_rss()
+    latencies = [latency for latency, _ in results]
+    statuses = [status for _, status in results]
+    return summarize(latencies, statuses, elapsed)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline):
+    print(f"\n{'ruta':<24} {'p95 antes':>10} {'p95 ahora':>10} {'cambio':>8}")
+    for route, stats in current["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if not previous:
+            continue
+        change = stats["p95_ms"] / previous["p95_ms"] if previous["p95_ms"] else float('nan')
+        print(f"{route:<24} {previous['p95_ms']:>10.2f} {stats['p95_ms']:>10.2f} {change:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de las rutas principales.")
+    parser.add_argument('--target', choices=['flask', 'gunicorn'], default='flask')
+    parser.add_argument('--rows', type=int, default=100_000, help="filas de la base sintética")
+    parser.add_argument('--data', default=None, help="usar esta base en lugar de generar una")
+    parser.add_argument('--requests', type=int, default=200, help="peticiones por ruta")
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=2, help="workers de gunicorn")
+    parser.add_argument('--threads', type=int, default=8, help="hilos por worker de gunicorn (gthread)")
+    parser.add_argument('--routes', default=','.join(ROUTES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="guardar el resultado en JSON")
+    parser.add_argument('--compare', default=None, help="JSON de una corrida anterior")
+    parser.add_argument('--keep', action='store_true', help="no borrar el directorio temporal")
+    args = parser.parse_args()
+
+    # El cliente de Flask cambia el directorio de trabajo: rutas absolutas
+    output, baseline, data = (os.path.abspath(path) if path else None for path in (args.output, args.compare, args.data))
+    routes = [route.strip() for route in args.routes.split(',') if route.strip()]
+    workdir = tempfile.mkdtemp(prefix='adheplast_bench_')
+    target = None
+    try:
+        start = time.perf_counter()
+        csv_path = prepare_workdir(workdir, args.rows, args.seed, data)
+        samples = load_samples(csv_path, args.seed)
+        print(f"Base lista en {time.perf_counter() - start:.1f}s ({workdir})")
+
+        if args.target == 'gunicorn':
+            target = GunicornTarget(workdir, workers=args.workers, threads=args.threads)
+        else:
+            target = FlaskClientTarget(workdir)
+
+        start = time.perf_counter()
+        target.warm_up()
+        warm_up_seconds = time.perf_counter() - start
+
+        results = {}
+        print(f"{'ruta':<24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errores':>8}")
+        for route in routes:
+            stats = run_route(target, route, samples, args.requests, args.concurrency, args.seed)
+            results[route] = stats
+            print(f"{route:<24} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+                  f"{stats['throughput_rps']:>9.1f} {stats['errors']:>8}")
+
+        report = {
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "target": args.target,
+            "rows": samples["rows"],
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers if args.target == 'gunicorn' else None,
+            "threads": args.threads if args.target == 'gunicorn' else None,
+            "warm_up_seconds": round(warm_up_seconds, 3),
+            "peak_rss_mb": round(target.peak_rss_kb() / 1024, 1),
+            "routes": results,
+        }
+        print(f"RSS máximo: {report['peak_rss_mb']} MB, calentamiento: {report['warm_up_seconds']}s")
+
+        if output:
+            with open(output, 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+        if baseline:
+            with open(baseline) as baseline_file:
+                compare(report, json.load(baseline_file))
+    finally:
+        if target is not None:
+            target.close()
+        if args.keep:
+            print(f"Datos de la prueba en {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Tiempo de arranque y memoria de la aplicación.
+
+Mide dos cosas sobre una base sintética:
+
+    import   tiempo de `import app.main` en un proceso nuevo, RSS de ese proceso
+             y módulos pesados cargados (fpdf y requests no deben cargarse al
+             importar, ni debe crearse data/)
+    gunicorn tiempo hasta responder la primera consulta y PSS total (master +
+             workers) con y sin preload_app (PRELOAD=1 / PRELOAD=0)
+
+PSS reparte las páginas compartidas entre los procesos que las usan, así que
+refleja lo que ahorra cargar la base una vez en el master y heredarla con fork.
+
+Termina con código 1 si el import supera --max-import-seconds o --max-import-rss-mb,
+si se carga algún módulo de LAZY_MODULES al importar, o si con preload el PSS
+total no es menor que sin preload.
+
+Uso:
+    python -m benchmarks.bench_startup --rows 100000 --workers 2
+    python -m benchmarks.bench_startup --skip-gunicorn --max-import-seconds 1.5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_routes import REPO_ROOT, GunicornTarget, _children, prepare_workdir
+
+# Módulos que solo se cargan al generar el primer PDF (o que ya no se usan)
+LAZY_MODULES = ['fpdf', 'app.reports', 'requests']
+
+IMPORT_PROBE = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "lazy_loaded": [name for name in %r if name in sys.modules],
+    "created_data": os.path.exists('data'),
+}))
+"""
+
+
+def measure_import(repeat):
+    """Importa app.main en `repeat` procesos nuevos dentro de un directorio vacío."""
+    runs = []
+    for _ in range(repeat):
+        workdir = tempfile.mkdtemp(prefix='adheplast_import_')
+        try:
+            output = subprocess.run(
+                [sys.executable, '-c', IMPORT_PROBE % (LAZY_MODULES,)],
+                cwd=workdir, env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+                check=True, capture_output=True, text=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "seconds_median": round(statistics.median(run["seconds"] for run in runs), 3),
+        "seconds_max": round(max(run["seconds"] for run in runs), 3),
+        "rss_mb": round(max(run["rss_mb"] for run in runs), 1),
+        "modules": runs[-1]["modules"],
+        "lazy_loaded": sorted({name for run in runs for name in run["lazy_loaded"]}),
+        "created_data": any(run["created_data"] for run in runs),
+    }
+
+
+def _pss_kb(pid):
+    # Pss de /proc/<pid>/smaps_rollup (Linux 4.14+)
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as smaps_file:
+            for line in smaps_file:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def measure_gunicorn(workdir, workers, preload):
+    start = time.perf_counter()
+    target = GunicornTarget(workdir, workers=workers, threads=8, env={'PRELOAD': '1' if preload else '0'})
+    try:
+        ready_seconds = time.perf_counter() - start
+        while len(_children(target.process.pid)) < workers and time.perf_counter() - start < 60:
+            time.sleep(0.1)
+        # Cada worker atiende al menos una consulta que usa la base
+        target.warm_up()
+        warm_seconds = time.perf_counter() - start
+        pids = [target.process.pid] + _children(target.process.pid)
+        return {
+            "ready_seconds": round(ready_seconds, 3),
+            "first_queries_seconds": round(warm_seconds, 3),
+            "processes": len(pids),
+            "pss_mb": round(sum(_pss_kb(pid) for pid in pids) / 1024, 1),
+            "rss_mb": round(target.peak_rss_kb() / 1024, 1),
+        }
+    finally:
+        target.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque y memoria de la aplicación.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--data', default=None, help="usar esta base en lugar de generar una")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=5, help="procesos para medir el import")
+    parser.add_argument('--max-import-seconds', type=float, default=2.0)
+    parser.add_argument('--max-import-rss-mb', type=float, default=250.0)
+    parser.add_argument('--skip-gunicorn', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="guardar el resultado en JSON")
+    args = parser.parse_args()
+
+    failures = []
+    results = {"import": measure_import(args.repeat)}
+    imported = results["import"]
+    print(f"import app.main: {imported['seconds_median']}s (máx {imported['seconds_max']}s), "
+          f"RSS {imported['rss_mb']} MB, {imported['modules']} módulos")
+    if imported["seconds_median"] > args.max_import_seconds:
+        failures.append(f"import tarda más de {args.max_import_seconds}s")
+    if imported["rss_mb"] > args.max_import_rss_mb:
+        failures.append(f"RSS del import mayor a {args.max_import_rss_mb} MB")
+    if imported["lazy_loaded"]:
+        failures.append(f"módulos cargados al importar: {imported['lazy_loaded']}")
+    if imported["created_data"]:
+        failures.append("el import creó data/")
+
+    if not args.skip_gunicorn:
+        workdir = tempfile.mkdtemp(prefix='adheplast_bench_')
+        try:
+            prepare_workdir(workdir, args.rows, args.seed, args.data and os.path.abspath(args.data))
+            print(f"{'preload':<8} {'listo':>8} {'consultas':>10} {'procesos':>9} {'PSS MB':>8} {'RSS MB':>8}")
+            for preload in (False, True):
+                # Cada modo arranca sin las bases SQLite que dejó el anterior
+                for leftover in ('orders', 'added_products'):
+                    shutil.rmtree(os.path.join(workdir, 'data', leftover), ignore_errors=True)
+                result = measure_gunicorn(workdir, args.workers, preload)
+                results["preload" if preload else "no_preload"] = result
+                print(f"{'sí' if preload else 'no':<8} {result['ready_seconds']:>8.2f} "
+                      f"{result['first_queries_seconds']:>10.2f} {result['processes']:>9} "
+                      f"{result['pss_mb']:>8.1f} {result['rss_mb']:>8.1f}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        if results["preload"]["pss_mb"] >= results["no_preload"]["pss_mb"]:
+            failures.append("con preload el PSS total no es menor que sin preload")
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(dict(results, rows=args.rows, workers=args.workers), output_file, indent=2)
+
+    for failure in failures:
+        print(f"FALLA: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
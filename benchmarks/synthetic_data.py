@@ -0,0 +1,164 @@
+"""Genera una base de ventas sintética con el esquema real de Basesdedatos.csv.
+
+Vendedor, Cliente, Nombre, Categoria, Material, Descripcion, Presentacion,
+Embalaje, Factor, una columna por mes ("Jan-24" ... ) y Pedido1/Pedido2/Total
+vacíos. Cada cliente tiene un surtido de materiales sin repetir y las ventas
+mensuales son dispersas (muchos meses vacíos), como en la base real. Con la
+misma semilla el archivo es idéntico.
+
+Uso:
+    python -m benchmarks.synthetic_data data/uploaded_files/Basesdedatos.csv --rows 1000000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+ENGLISH_MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+CATEGORY_NAMES = [
+    'ADHESIVOS', 'SELLADORES', 'PINTURAS', 'ACABADOS', 'IMPERMEABILIZANTES', 'HERRAMIENTAS',
+    'CINTAS', 'SILICONAS', 'MASILLAS', 'DILUYENTES', 'ESMALTES', 'LACAS', 'BARNICES',
+    'ANTICORROSIVOS', 'PEGAMENTOS', 'ESPUMAS', 'LIJAS', 'BROCHAS', 'RODILLOS', 'FIJADORES',
+]
+PRESENTATIONS = ['LITRO', 'GALON', 'CANECA', 'TUBO', 'CARTUCHO', 'KILO', 'UNIDAD', 'ROLLO']
+PACKAGES = ['CAJA 6 UN', 'CAJA 12 UN', 'CAJA 24 UN', 'PACA 4 UN', 'UNIDAD']
+FACTORS = ['1', '4', '6', '12', '24']
+BUSINESS_TYPES = ['FERRETERIA', 'DISTRIBUIDORA', 'CONSTRUCTORA', 'PINTURAS', 'COMERCIAL', 'DEPOSITO', 'MATERIALES']
+CITIES = ['QUITO', 'GUAYAQUIL', 'CUENCA', 'AMBATO', 'MANTA', 'LOJA', 'IBARRA', 'MACHALA', 'RIOBAMBA', 'PORTOVIEJO']
+
+BASE_COLUMNS = ['Vendedor', 'Cliente', 'Nombre', 'Categoria', 'Material', 'Descripcion', 'Presentacion', 'Embalaje', 'Factor']
+ORDER_COLUMNS = ['Pedido1', 'Pedido2', 'Total']
+
+
+def month_columns(start='2024-01', months=24):
+    periods = pd.period_range(start=start, periods=months, freq='M')
+    return [f"{ENGLISH_MONTHS[p.month - 1]}-{p.year % 100:02d}" for p in periods]
+
+
+def category_names(count):
+    names = list(CATEGORY_NAMES)
+    suffix = 2
+    while len(names) < count:
+        names.extend(f"{name} {suffix}" for name in CATEGORY_NAMES)
+        suffix += 1
+    return names[:count]
+
+
+def build_materials(rng, materials, categories):
+    """Maestro de materiales: cada material pertenece a una sola categoría."""
+    names = np.array(category_names(categories), dtype=object)
+    category = names[rng.integers(0, categories, materials)]
+    presentation = np.array(PRESENTATIONS, dtype=object)[rng.integers(0, len(PRESENTATIONS), materials)]
+    return pd.DataFrame({
+        'Categoria': category,
+        'Material': [f"{400000 + i:07d}" for i in range(materials)],
+        'Descripcion': [f"{cat} {pres} {i:05d}" for i, (cat, pres) in enumerate(zip(category, presentation))],
+        'Presentacion': presentation,
+        'Embalaje': np.array(PACKAGES, dtype=object)[rng.integers(0, len(PACKAGES), materials)],
+        'Factor': np.array(FACTORS, dtype=object)[rng.integers(0, len(FACTORS), materials)],
+    })
+
+
+def build_clients(rng, clients, vendors):
+    business = np.array(BUSINESS_TYPES, dtype=object)[rng.integers(0, len(BUSINESS_TYPES), clients)]
+    city = np.array(CITIES, dtype=object)[rng.integers(0, len(CITIES), clients)]
+    return pd.DataFrame({
+        'Vendedor': [f"{v:03d}" for v in rng.integers(1, vendors + 1, clients)],
+        'Cliente': [f"{20000000 + i:010d}" for i in range(clients)],
+        'Nombre': [f"{b} {c} {i}" for i, (b, c) in enumerate(zip(business, city))],
+    })
+
+
+def assign_rows(rng, rows, clients, materials):
+    """Reparte las filas entre clientes (pocos clientes grandes, muchos pequeños)."""
+    weights = rng.lognormal(mean=0.0, sigma=1.0, size=clients)
+    counts = np.floor(weights / weights.sum() * rows).astype(np.int64)
+    counts = np.clip(counts, 1, materials)
+    # Ajustar para llegar exactamente al número de filas pedido
+    while counts.sum() != rows:
+        difference = rows - counts.sum()
+        room = np.flatnonzero(counts < materials) if difference > 0 else np.flatnonzero(counts > 1)
+        if not len(room):
+            break
+        chosen = rng.choice(room, min(abs(difference), len(room)), replace=False)
+        counts[chosen] += 1 if difference > 0 else -1
+
+    client_positions = np.repeat(np.arange(clients), counts)
+    material_positions = np.concatenate([rng.choice(materials, count, replace=False) for count in counts])
+    return client_positions, material_positions
+
+
+def generate(path, rows=100_000, clients=None, materials=None, categories=40, vendors=60,
+             start='2024-01', months=24, seed=0, chunk_size=100_000):
+    """Escribe la base sintética en `path` y devuelve un resumen de lo generado."""
+    rng = np.random.default_rng(seed)
+    clients = clients or max(rows // 150, 1)
+    materials = materials or int(min(max(rows // 100, 200), 20_000))
+    months_header = month_columns(start, months)
+
+    material_table = build_materials(rng, materials, categories)
+    client_table = build_clients(rng, clients, vendors)
+    client_positions, material_positions = assign_rows(rng, rows, clients, materials)
+    rows = len(client_positions)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    header = BASE_COLUMNS + months_header + ORDER_COLUMNS
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        for chunk_start in range(0, rows, chunk_size):
+            chunk = slice(chunk_start, min(chunk_start + chunk_size, rows))
+            size = chunk.stop - chunk.start
+            client_part = client_table.iloc[client_positions[chunk]].reset_index(drop=True)
+            material_part = material_table.iloc[material_positions[chunk]].reset_index(drop=True)
+            frame = pd.concat([client_part, material_part], axis=1)
+
+            # Demanda base por fila y meses vacíos con probabilidad ~60%
+            demand = rng.lognormal(mean=2.0, sigma=1.0, size=(size, 1))
+            values = (demand * rng.uniform(0.5, 1.5, size=(size, months))).round(1)
+            values[rng.random((size, months)) < 0.6] = np.nan
+            frame = pd.concat([frame, pd.DataFrame(values, columns=months_header)], axis=1)
+            for col in ORDER_COLUMNS:
+                frame[col] = np.nan
+
+            frame[header].to_csv(csv_file, index=False, header=chunk_start == 0)
+
+    return {
+        "path": path,
+        "rows": rows,
+        "clients": clients,
+        "materials": materials,
+        "categories": categories,
+        "vendors": vendors,
+        "months": months_header,
+        "seed": seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una base de ventas sintética.")
+    parser.add_argument('path', nargs='?', default=os.path.join('data', 'uploaded_files', 'Basesdedatos.csv'))
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--clients', type=int, default=None, help="por defecto filas / 150")
+    parser.add_argument('--materials', type=int, default=None, help="por defecto filas / 100 (200 a 20000)")
+    parser.add_argument('--categories', type=int, default=40)
+    parser.add_argument('--vendors', type=int, default=60)
+    parser.add_argument('--start', default='2024-01', help="primer mes (AAAA-MM)")
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = generate(args.path, rows=args.rows, clients=args.clients, materials=args.materials,
+                       categories=args.categories, vendors=args.vendors, start=args.start,
+                       months=args.months, seed=args.seed)
+    print(f"{summary['rows']} filas, {summary['clients']} clientes, {summary['materials']} materiales "
+          f"en {time.perf_counter() - start:.1f}s -> {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Configuración de gunicorn (se carga sola al ejecutar gunicorn desde la raíz del repo).
+
+    gunicorn app.main:app
+
+Workers gthread: cada worker atiende THREADS peticiones a la vez en hilos, así
+una descarga de PDF o una escritura de archivo no bloquea el worker completo.
+Los PDFs se generan en un pool de procesos propio de cada worker (PDF_WORKERS,
+PDF_QUEUE en app/main.py) que arranca con el primer PDF; el hilo de la petición
+solo espera el resultado.
+
+Con preload_app el master importa la aplicación y carga el catálogo antes de
+crear los workers: los workers se crean con fork y comparten esas páginas de
+memoria (copy-on-write) en lugar de leer y guardar cada uno su copia de la base.
+Una base nueva subida con /upload_base la vuelve a cargar cada worker.
+
+Variables de entorno:
+    PORT             puerto (5000)
+    WEB_CONCURRENCY  procesos worker (2)
+    THREADS          hilos por worker (8)
+    TIMEOUT          segundos antes de reiniciar un worker colgado (120)
+    PRELOAD          0 para que cada worker importe la aplicación y cargue su base (1)
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('THREADS', 8))
+timeout = int(os.environ.get('TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+preload_app = os.environ.get('PRELOAD', '1') != '0'
+
+
+def when_ready(server):
+    # Se ejecuta en el master antes de crear los workers
+    if not server.cfg.preload_app:
+        return
+    from app.main import warm_up
+    try:
+        warm_up()
+    except Exception as e:
+        # Sin catálogo precargado cada worker lo carga en su primera petición
+        server.log.warning("No se pudo precargar el catálogo: %s", e)